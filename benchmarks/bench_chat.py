@@ -0,0 +1,197 @@
+"""End-to-end throughput benchmarks for MixerChat, MixerConstellation and MixerAPI.
+
+Runs against the local fake server (see fake_mixer.py), started in a child process.
+For each channel count it measures chat messages handled per second, command round trip
+latency (viewer sends '!ping', the bot's reply is echoed back), Constellation events per
+second, REST requests per second and the memory used by the clients.
+
+    python benchmarks/bench_chat.py --channels 1 100 1000 --messages 100
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import argparse
+import asyncio
+import resource
+import time
+import tracemalloc
+
+import aiohttp
+
+import fake_mixer
+from mixer.api import MixerAPI
+from mixer.chat import MixerChat
+from mixer.constellation import MixerConstellation
+from mixer.oauth import MixerOAuth
+from mixer.registry import MixerEventRegistry
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+async def control(http_url, path, body):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(http_url + path, json = body) as response:
+            return await response.json()
+
+async def bench(channel_count, message_count, ping_rounds, http_port, ws_port, compression = "deflate"):
+
+    http_url = "http://127.0.0.1:{}".format(http_port)
+    results = { "channels": channel_count }
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    api = MixerAPI("client_id", "client_secret")
+    api.API_URL = http_url + "/api/v1"
+    api.API_URL_V2 = http_url + "/api/v2"
+    oauth = await MixerOAuth.create(api, "access_token", "refresh_token")
+
+    # every chat shares one registry, so handlers are registered once
+    registry = MixerEventRegistry(dict(MixerChat.event_map, ChatMessage = "handle_message"))
+    ready = asyncio.Event()
+    authenticated = 0
+    target = 0
+    received = 0
+    all_received = asyncio.Event()
+    expected = channel_count * message_count
+    pongs = dict()
+
+    async def on_ready(username, user_id):
+        nonlocal authenticated
+        authenticated += 1
+        if authenticated == target:
+            ready.set()
+
+    async def handle_message(message):
+        nonlocal received
+        if message.username == "bot":
+            future = pongs.get(message.data["channel"])
+            if future is not None and not future.done():
+                future.set_result(time.perf_counter())
+            return
+        if message.handled:
+            return
+        received += 1
+        if received == expected:
+            all_received.set()
+
+    async def ping(message):
+        return "pong!"
+
+    registry.add("on_ready", on_ready)
+    registry.add("handle_message", handle_message)
+
+    # connect every chat
+    started = time.perf_counter()
+    chats = list()
+    for channel_id in range(1, channel_count + 1):
+        chat = await MixerChat.create(api, str(channel_id), registry = registry, shed_threshold = 10 ** 9)
+        chat.commands.add("ping", ping)
+        chat.ws_options = { "compression": compression }
+        chats.append(chat)
+
+    # connect in waves, so the fake server isn't handed every handshake at once
+    tasks = list()
+    for i in range(0, channel_count, 50):
+        target = min(i + 50, channel_count)
+        ready.clear()
+        tasks.extend(asyncio.ensure_future(chat.start(oauth)) for chat in chats[i:target])
+        await asyncio.wait_for(ready.wait(), 120)
+    results["connect_seconds"] = time.perf_counter() - started
+    results["memory_per_channel_kb"] = (tracemalloc.get_traced_memory()[0] - baseline) / channel_count / 1024
+
+    # chat throughput
+    started = time.perf_counter()
+    await control(http_url, "/_fake/messages", { "count": message_count, "text": "hello world" })
+    await asyncio.wait_for(all_received.wait(), 300)
+    elapsed = time.perf_counter() - started
+    results["messages_per_second"] = expected / elapsed
+
+    # command round trip latency
+    latencies = list()
+    for _ in range(ping_rounds):
+        pongs.clear()
+        for chat in chats:
+            pongs[chat.channel.id] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        await control(http_url, "/_fake/messages", { "count": 1, "text": "!ping" })
+        finished = await asyncio.wait_for(asyncio.gather(*pongs.values()), 120)
+        latencies.extend(t - started for t in finished)
+    results["ping_p50_ms"] = percentile(latencies, .5) * 1000
+    results["ping_p99_ms"] = percentile(latencies, .99) * 1000
+
+    # bandwidth, wire bytes (after compression) relative to json payload bytes
+    payload = sum(chat.websocket.bytes_received for chat in chats)
+    if all(chat.websocket.wire_bytes_received is not None for chat in chats):
+        wire = sum(chat.websocket.wire_bytes_received for chat in chats)
+        results["chat_wire_kb"] = wire / 1024
+        results["chat_wire_ratio"] = wire / payload if payload else 0
+    else: # wire bytes can't be counted on this event loop (ex: uvloop)
+        results["chat_wire_kb"] = results["chat_wire_ratio"] = None
+
+    # constellation throughput
+    events = 0
+    events_done = asyncio.Event()
+    event_count = message_count * 10
+
+    async def on_event(packet, payload):
+        nonlocal events
+        events += 1
+        if events == event_count:
+            events_done.set()
+
+    async def subscribe(constellation):
+        await constellation.subscribe("channel:1:update", on_event)
+
+    constellation = MixerConstellation(subscribe)
+    constellation.ws_options = { "compression": compression }
+    constellation.CONSTELLATION_URL = "ws://127.0.0.1:{}/constellation".format(ws_port)
+    constellation_task = asyncio.ensure_future(constellation.start())
+    while constellation.websocket is None or not constellation.callbacks:
+        await asyncio.sleep(.01)
+    await asyncio.sleep(.1) # let the subscription reach the server
+    started = time.perf_counter()
+    await control(http_url, "/_fake/constellation", { "event": "channel:1:update", "payload": { "viewersCurrent": 1 }, "count": event_count })
+    await asyncio.wait_for(events_done.wait(), 120)
+    results["constellation_events_per_second"] = event_count / (time.perf_counter() - started)
+
+    # rest throughput
+    started = time.perf_counter()
+    await asyncio.gather(*[api.get_channel(str(i)) for i in range(1, max(channel_count, 100) + 1)])
+    results["rest_requests_per_second"] = max(channel_count, 100) / (time.perf_counter() - started)
+
+    results["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    results["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    tracemalloc.stop()
+
+    for task in tasks + [constellation_task]:
+        task.cancel()
+    await asyncio.gather(*tasks, constellation_task, return_exceptions = True)
+    await api.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type = int, nargs = "+", default = [1, 100, 1000])
+    parser.add_argument("--messages", type = int, default = 100, help = "messages sent to each channel")
+    parser.add_argument("--pings", type = int, default = 5, help = "rounds of '!ping' sent to every channel")
+    parser.add_argument("--compression", choices = ["deflate", "none"], default = "deflate", help = "websocket compression to negotiate")
+    args = parser.parse_args()
+
+    for channel_count in args.channels:
+
+        # use a fresh server for each run, so connections from the previous run don't linger
+        process, http_port, ws_port = fake_mixer.start_process()
+        try:
+            compression = None if args.compression == "none" else args.compression
+            results = asyncio.run(bench(channel_count, args.messages, args.pings, http_port, ws_port, compression))
+        finally:
+            process.terminate()
+            process.join()
+
+        print(", ".join("{}={}".format(k, round(v, 2) if isinstance(v, float) else v) for k, v in results.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compares MixerChatFilter (Aho-Corasick) against checking each banned phrase with a Python loop.
+
+    python benchmarks/bench_filter.py --phrases 100 1000 5000 --messages 20000
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import argparse
+import random
+import string
+import time
+
+from mixer.filter import MixerChatFilter
+
+def random_word(rng, length):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+def naive_scan(phrases, text):
+    lowered = text.lower()
+    matches = list()
+    for phrase in phrases:
+        start = lowered.find(phrase)
+        while start != -1:
+            matches.append((start, start + len(phrase), phrase))
+            start = lowered.find(phrase, start + 1)
+    return matches
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phrases", type = int, nargs = "+", default = [100, 1000, 5000])
+    parser.add_argument("--messages", type = int, default = 20000)
+    parser.add_argument("--seed", type = int, default = 1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted(set(random_word(rng, rng.randint(3, 9)) for _ in range(20000)))
+
+    for phrase_count in args.phrases:
+        phrases = rng.sample(vocabulary, phrase_count)
+        messages = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 15))) for _ in range(args.messages)]
+
+        started = time.perf_counter()
+        chat_filter = MixerChatFilter(phrases, whole_words = False)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        automaton_matches = sum(len(chat_filter.scan_text(text)) for text in messages)
+        automaton = time.perf_counter() - started
+
+        started = time.perf_counter()
+        naive_matches = sum(len(naive_scan(phrases, text)) for text in messages)
+        naive = time.perf_counter() - started
+
+        assert automaton_matches == naive_matches, (automaton_matches, naive_matches)
+        print("phrases={}, build_ms={:.1f}, automaton_msgs_per_second={:.0f}, naive_msgs_per_second={:.0f}, speedup={:.1f}x".format(
+            phrase_count, build * 1000, len(messages) / automaton, len(messages) / naive, naive / automaton))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measures how long it takes to import the mixer package and its modules.
+
+Each module is imported in a fresh interpreter (python -X importtime), taking the best of
+several runs. Results are compared against import_budget.json: the script exits with status 1
+if a module is slower than its budget or imports a dependency it's not allowed to.
+
+Budgets are relative to the import time of a standard library module (REFERENCE_MODULE) measured
+in the same run, so they hold on machines of any speed.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --update   # rewrite the budget from this machine's timings
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+HEAVY_DEPENDENCIES = ("aiohttp", "websockets", "dateutil", "requests")
+
+# a budget is the measured time multiplied by this, leaving room for noisy machines
+BUDGET_HEADROOM = 2.0
+
+# budgets are multiples of this module's import time, measured the same way
+REFERENCE_MODULE = "asyncio"
+
+# modules may always take this long, so tiny imports don't fail on timer noise
+BUDGET_FLOOR_MS = 5.0
+
+def measure(module, runs):
+    """Returns the best cumulative import time (in ms) of a module, and the heavy dependencies it loaded."""
+
+    code = "import sys, {0}; print(','.join(m for m in {1!r} if m in sys.modules))".format(module, HEAVY_DEPENDENCIES)
+    best = None
+    loaded = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd = ROOT, capture_output = True, text = True, check = True)
+        loaded = [m for m in result.stdout.strip().split(",") if m]
+
+        # lines look like: "import time:   self [us] |  cumulative | imported package"
+        cumulative = None
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.split("|")]
+            if len(parts) == 3 and parts[2].strip() == module:
+                cumulative = int(parts[1]) / 1000
+        if cumulative is not None and (best is None or cumulative < best):
+            best = cumulative
+
+    return best, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type = int, default = 5)
+    parser.add_argument("--update", action = "store_true", help = "rewrite the budget file from the current timings")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH) as file:
+        budget = json.load(file)
+
+    reference, _ = measure(REFERENCE_MODULE, args.runs)
+    print("{:<24} {:>8.1f}ms  (reference)".format(REFERENCE_MODULE, reference))
+
+    failed = False
+    for module, limits in budget.items():
+        elapsed, loaded = measure(module, args.runs)
+        allowed = set(limits.get("allowed_dependencies", []))
+        unexpected = sorted(set(loaded) - allowed)
+
+        status = "ok"
+        if unexpected:
+            status = "FAIL (imports {})".format(", ".join(unexpected))
+        elif limits.get("max_ratio") is not None and not args.update:
+            max_ms = max(limits["max_ratio"] * reference, BUDGET_FLOOR_MS)
+            if elapsed > max_ms:
+                status = "FAIL (budget {:.1f}ms)".format(max_ms)
+        failed = failed or status != "ok"
+        print("{:<24} {:>8.1f}ms  {:>5.2f}x  {}".format(module, elapsed, elapsed / reference, status))
+
+        if args.update:
+            limits.pop("max_ms", None)
+            limits["max_ratio"] = round(elapsed * BUDGET_HEADROOM / reference, 2)
+
+    if args.update:
+        with open(BUDGET_PATH, "w") as file:
+            json.dump(budget, file, indent = 4)
+            file.write("\n")
+
+    sys.exit(1 if failed and not args.update else 0)
+
+if __name__ == "__main__":
+    main()
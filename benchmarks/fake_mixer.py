@@ -0,0 +1,316 @@
+"""A local stand-in for the Mixer chat, Constellation and REST services.
+
+Run it standalone (python benchmarks/fake_mixer.py --http-port 8000 --ws-port 8001) or in a
+child process via start_process(), so it doesn't share an event loop (or memory) with the
+client being measured. Point a client at it with:
+
+    api.API_URL = "http://127.0.0.1:8000/api/v1"
+    api.API_URL_V2 = "http://127.0.0.1:8000/api/v2"
+    constellation.CONSTELLATION_URL = "ws://127.0.0.1:8001/constellation"
+
+Simulated traffic is generated through control endpoints:
+
+    POST /_fake/messages       { "channels": [1, 2], "count": 100, "text": "hi", "username": "viewer" }
+    POST /_fake/constellation  { "event": "channel:1:update", "payload": {...}, "count": 100 }
+    GET  /_fake/stats
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import time
+import uuid
+from collections import Counter
+
+import websockets
+from aiohttp import web
+
+class FakeMixerServer:
+
+    def __init__(self, host = "127.0.0.1", http_port = 0, ws_port = 0):
+        self.host = host
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self._user_ids = itertools.count(1000)
+
+        # channel id -> set of chat connections
+        self.chat_connections = dict()
+
+        # constellation connection -> set of subscribed events
+        self.constellation_connections = dict()
+
+        # amount of 'method' packets received over chat, by method name
+        self.methods = Counter()
+
+    @property
+    def api_url(self):
+        return "http://{}:{}/api/v1".format(self.host, self.http_port)
+
+    @property
+    def api_url_v2(self):
+        return "http://{}:{}/api/v2".format(self.host, self.http_port)
+
+    @property
+    def chat_url(self):
+        return "ws://{}:{}/chat".format(self.host, self.ws_port)
+
+    @property
+    def constellation_url(self):
+        return "ws://{}:{}/constellation".format(self.host, self.ws_port)
+
+    async def start(self):
+        """Starts the HTTP and websocket servers on the running loop."""
+
+        app = web.Application()
+        app.router.add_get("/api/v1/channels/{id}", self.http_channel)
+        app.router.add_get("/api/v1/channels/{id}/broadcast", self.http_broadcast)
+        app.router.add_get("/api/v1/users/{id}", self.http_user)
+        app.router.add_get("/api/v1/users/{id}/links", self.http_links)
+        app.router.add_get("/api/v1/chats/{id}", self.http_chat)
+        app.router.add_post("/api/v1/oauth/token", self.http_token)
+        app.router.add_post("/api/v1/oauth/token/introspect", self.http_introspect)
+        app.router.add_get("/api/v2/leaderboards/{type}/channels/{id}", self.http_leaderboard)
+        app.router.add_get("/api/v2/chats/{id}/users", self.http_chatters)
+        app.router.add_post("/_fake/messages", self.control_messages)
+        app.router.add_post("/_fake/constellation", self.control_constellation)
+        app.router.add_get("/_fake/stats", self.control_stats)
+
+        self._runner = web.AppRunner(app, access_log = None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.http_port)
+        await site.start()
+        self.http_port = site._server.sockets[0].getsockname()[1]
+
+        self._ws_server = await websockets.serve(self.ws_handler, self.host, self.ws_port, max_size = None)
+        self.ws_port = list(self._ws_server.sockets)[0].getsockname()[1]
+
+    async def close(self):
+        self._ws_server.close()
+        await self._ws_server.wait_closed()
+        await self._runner.cleanup()
+
+    def channel_data(self, id_or_token):
+        try:
+            channel_id = int(id_or_token)
+            token = "channel{}".format(channel_id)
+        except ValueError:
+            token = id_or_token
+            channel_id = abs(hash(token)) % 10 ** 8
+
+        user_id = channel_id + 10 ** 8
+        return {
+            "id": channel_id,
+            "token": token,
+            "online": True,
+            "viewersCurrent": 0,
+            "numFollowers": 0,
+            "userId": user_id,
+            "user": { "id": user_id, "username": token }
+        }
+
+    def chat_message(self, channel_id, username, text, user_id = None, roles = None):
+        return {
+            "type": "event",
+            "event": "ChatMessage",
+            "data": {
+                "channel": channel_id,
+                "id": str(uuid.uuid4()),
+                "user_name": username,
+                "user_id": user_id or next(self._user_ids),
+                "user_roles": roles or ["User"],
+                "user_level": 1,
+                "user_avatar": None,
+                "message": {
+                    "message": [{ "type": "text", "data": text, "text": text }],
+                    "meta": {}
+                }
+            }
+        }
+
+    async def http_channel(self, request):
+        return web.json_response(self.channel_data(request.match_info["id"]))
+
+    async def http_user(self, request):
+        user_id = int(request.match_info["id"])
+        channel = self.channel_data(user_id - 10 ** 8)
+        user = dict(channel["user"], channel = channel)
+        return web.json_response(user)
+
+    async def http_broadcast(self, request):
+        started = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(time.time() - 3600))
+        return web.json_response({ "online": True, "startedAt": started })
+
+    async def http_links(self, request):
+        return web.json_response([])
+
+    async def http_chat(self, request):
+        channel_id = request.match_info["id"]
+        return web.json_response({
+            "roles": ["Owner", "User"],
+            "authkey": "authkey",
+            "permissions": ["chat", "connect"],
+            "endpoints": ["{}/{}".format(self.chat_url, channel_id)],
+            "isLoadShed": False
+        })
+
+    async def http_token(self, request):
+        return web.json_response({
+            "access_token": uuid.uuid4().hex,
+            "refresh_token": uuid.uuid4().hex,
+            "expires_in": 21600,
+            "token_type": "Bearer"
+        })
+
+    async def http_introspect(self, request):
+        return web.json_response({
+            "active": True,
+            "sub": 1,
+            "username": "bot",
+            "exp": int(time.time()) + 21600,
+            "token_type": "access_token"
+        })
+
+    async def http_leaderboard(self, request):
+        return web.json_response([])
+
+    async def http_chatters(self, request):
+        return web.json_response([])
+
+    async def control_messages(self, request):
+        body = await request.json()
+        channels = body.get("channels") or list(self.chat_connections.keys())
+        texts = [body.get("text", "hello")] * body.get("count", 1)
+        for channel_id in channels:
+            await self.send_messages(channel_id, texts, body.get("username", "viewer"), body.get("roles"))
+        return web.json_response({ "sent": len(channels) * len(texts) })
+
+    async def control_constellation(self, request):
+        body = await request.json()
+        for _ in range(body.get("count", 1)):
+            await self.publish(body["event"], body.get("payload", dict()))
+        return web.json_response({ "sent": body.get("count", 1) })
+
+    async def control_stats(self, request):
+        return web.json_response({
+            "chat_connections": sum(len(c) for c in self.chat_connections.values()),
+            "constellation_connections": len(self.constellation_connections),
+            "methods": dict(self.methods)
+        })
+
+    async def ws_handler(self, connection, path = None):
+        if path is None:
+            path = connection.request.path
+        if path.startswith("/chat/"):
+            await self.chat_handler(connection, int(path.rsplit("/", 1)[1]))
+        elif path.startswith("/constellation"):
+            await self.constellation_handler(connection)
+
+    async def chat_handler(self, connection, channel_id):
+
+        connections = self.chat_connections.setdefault(channel_id, set())
+        connections.add(connection)
+        await connection.send(json.dumps({ "type": "event", "event": "WelcomeEvent", "data": { "server": "fake" } }))
+
+        try:
+            async for raw in connection:
+                packet = json.loads(raw)
+                if packet.get("type") != "method":
+                    continue
+
+                self.methods[packet["method"]] += 1
+                method, arguments = packet["method"], packet.get("arguments", [])
+                if method == "auth":
+                    data = { "authenticated": True, "roles": ["Owner", "User"] }
+                elif method == "msg":
+                    message = self.chat_message(channel_id, "bot", arguments[0], user_id = 1, roles = ["Owner"])
+                    data = message["data"]
+                    await self.broadcast(channel_id, message)
+                elif method == "whisper":
+                    data = self.chat_message(channel_id, "bot", arguments[1], user_id = 1)["data"]
+                else:
+                    data = None
+
+                await connection.send(json.dumps({ "type": "reply", "error": None, "id": packet["id"], "data": data }))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            connections.discard(connection)
+
+    async def constellation_handler(self, connection):
+
+        self.constellation_connections[connection] = set()
+        await connection.send(json.dumps({ "type": "event", "event": "hello", "data": { "authenticated": False } }))
+
+        try:
+            async for raw in connection:
+                packet = json.loads(raw)
+                if packet.get("method") == "livesubscribe":
+                    self.constellation_connections[connection].update(packet["params"]["events"])
+                elif packet.get("method") == "liveunsubscribe":
+                    self.constellation_connections[connection].difference_update(packet["params"]["events"])
+                await connection.send(json.dumps({ "type": "reply", "error": None, "id": packet.get("id"), "result": None }))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            del self.constellation_connections[connection]
+
+    async def broadcast(self, channel_id, packet):
+        """Sends a packet to every chat connection for a channel."""
+        raw = json.dumps(packet)
+        for connection in list(self.chat_connections.get(channel_id, ())):
+            try:
+                await connection.send(raw)
+            except websockets.ConnectionClosed:
+                pass
+
+    async def send_messages(self, channel_id, texts, username = "viewer", roles = None):
+        """Sends chat messages from a simulated viewer to a channel."""
+        for text in texts:
+            await self.broadcast(channel_id, self.chat_message(channel_id, username, text, roles = roles))
+
+    async def publish(self, event, payload):
+        """Sends a Constellation 'live' event to every subscribed connection."""
+        raw = json.dumps({ "type": "event", "event": "live", "data": { "channel": event, "payload": payload } })
+        for connection, events in list(self.constellation_connections.items()):
+            if event in events:
+                try:
+                    await connection.send(raw)
+                except websockets.ConnectionClosed:
+                    pass
+
+
+def serve(host = "127.0.0.1", http_port = 0, ws_port = 0, ready = None):
+    """Runs a FakeMixerServer forever. If provided, (http_port, ws_port) is put on the 'ready' queue."""
+
+    async def main():
+        server = FakeMixerServer(host, http_port, ws_port)
+        await server.start()
+        if ready is not None:
+            ready.put((server.http_port, server.ws_port))
+        else:
+            print("http: {}, websockets: {}".format(server.api_url, server.chat_url))
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+def start_process(host = "127.0.0.1"):
+    """Starts a FakeMixerServer in a child process.
+
+    Returns:
+        tuple: The process, the HTTP port and the websocket port.
+    """
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target = serve, args = (host, 0, 0, ready), daemon = True)
+    process.start()
+    http_port, ws_port = ready.get()
+    return process, http_port, ws_port
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Local stand-in for the Mixer services.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--http-port", type = int, default = 8000)
+    parser.add_argument("--ws-port", type = int, default = 8001)
+    args = parser.parse_args()
+    serve(args.host, args.http_port, args.ws_port)
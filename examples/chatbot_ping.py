@@ -5,40 +5,44 @@ import mixer.exceptions as MixerExceptions
 from mixer.api import MixerAPI
 from mixer.chat import MixerChat
 from mixer.oauth import MixerOAuth
+from mixer.runner import MixerRunner
 
-import asyncio
+import logging
 import settings
 
-async def init():
+# uses uvloop if it's installed, and shuts down cleanly on ctrl+c/SIGTERM
+runner = MixerRunner()
+
+async def main():
 
-    global api, auth, chat, cfg
     cfg = await settings.load()
 
     # initialize mixer api and chat client
-    api = MixerAPI(cfg["client_id"], cfg["client_secret"])
-    chat = await MixerChat.create(api, cfg["channel_name"])
+    api = runner.track(MixerAPI(cfg["client_id"], cfg["client_secret"]))
+    chat = runner.track(await MixerChat.create(api, cfg["channel_name"]))
 
     # initialize oauth wrapper
     try:
-        auth = await MixerOAuth.create(api, cfg["access_token"], cfg["refresh_token"])
+        auth = runner.track(await MixerOAuth.create(api, cfg["access_token"], cfg["refresh_token"]))
         auth.on_refresh(settings.update_tokens)
         await auth.ensure_active()
         auth.register_auto_refresh()
     except MixerExceptions.WebException as ex:
         print(ex.status, ex.text)
+        return
 
-loop = asyncio.get_event_loop()
-loop.run_until_complete(init())
+    # define commands
+    @chat.command()
+    async def ping(message):
+        return "pong!"
 
-# define commands
-@chat.commands
-async def ping(message):
-    return "pong!"
+    # define events
+    @chat
+    async def on_ready(username, id):
+        print("authenticated: {} [{}]".format(username, id))
 
-# define events
-@chat
-async def on_ready(username, id):
-    print("authenticated: {} [{}]".format(username, id))
+    # handle chat until the connection closes or the bot is stopped
+    await chat.start(auth)
 
-# start chat/oauth loops asynchronously
-loop.run_until_complete(chat.start(auth))
+logging.basicConfig(level = logging.INFO)
+runner.run(main())
@@ -0,0 +1,44 @@
+"""An unofficial Mixer API wrapper.
+
+Classes are imported from their modules on first access (ex: mixer.MixerChat), so
+importing the package itself doesn't pull in aiohttp, websockets or dateutil.
+"""
+
+import importlib
+
+# attribute name -> module it's defined in
+_LAZY_ATTRIBUTES = {
+    "MixerAPI": "api",
+    "MixerChat": "chat",
+    "MixerConstellation": "constellation",
+    "MixerLiveChannel": "live",
+    "MixerLeaderboard": "leaderboard",
+    "MixerChatAnalytics": "analytics",
+    "MixerScheduler": "scheduler",
+    "MixerRunner": "runner",
+    "MixerEvent": "events",
+    "MixerOAuth": "oauth",
+    "MixerWS": "ws",
+    "MixerUser": "objects",
+    "MixerChannel": "objects",
+    "MixerChatMessage": "objects",
+    "MixerEventRegistry": "registry",
+    "MixerPacketPipeline": "pipeline",
+    "MixerSession": "session",
+    "MixerCache": "cache",
+    "WebException": "exceptions",
+    "NotFound": "exceptions"
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError("module 'mixer' has no attribute '{}'".format(name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value # cache, so __getattr__ isn't called again
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,252 @@
+import time
+from array import array
+from collections import deque
+from hashlib import blake2b
+from math import log
+
+from .metrics import metrics
+
+def _hash(value):
+    """int: A 64 bit hash of a value, stable between processes (unlike hash())."""
+    return int.from_bytes(blake2b(str(value).encode(), digest_size = 8).digest(), "little")
+
+class HyperLogLog:
+    """Approximate distinct counter using 2^precision bytes (standard error 1.04 / sqrt(2^precision))."""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision = 10):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        h = _hash(value)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Adds every value counted by another HyperLogLog (of the same precision)."""
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self):
+        """int: Estimated amount of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # linear counting is more accurate for small cardinalities
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * log(m / zeros)
+        return int(round(estimate))
+
+class CountMinSketch:
+    """Approximate frequency counter using width * depth counters, which never underestimates.
+
+    The 'top' most frequent keys are tracked as heavy hitter candidates, since a sketch
+    can only answer queries for keys it's given.
+    """
+
+    __slots__ = ("width", "depth", "top", "counters", "total", "candidates")
+
+    def __init__(self, width = 256, depth = 4, top = 10):
+        self.width = width
+        self.depth = depth
+        self.top = top
+        self.counters = array("I", bytes(4 * width * depth))
+        self.total = 0
+
+        # key -> estimated count, at most 2 * top entries
+        self.candidates = dict()
+
+    def _indexes(self, key):
+        h = _hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count = 1):
+        indexes = self._indexes(key)
+        counters = self.counters
+        for i in indexes:
+            counters[i] += count
+        self.total += count
+        self._offer(key, min(counters[i] for i in indexes))
+
+    def _offer(self, key, estimate):
+        self.candidates[key] = estimate
+        if len(self.candidates) > 2 * self.top:
+            ranked = sorted(self.candidates.items(), key = lambda item: item[1], reverse = True)
+            self.candidates = dict(ranked[:self.top])
+
+    def estimate(self, key):
+        """int: Estimated count of a key (an upper bound)."""
+        return min(self.counters[i] for i in self._indexes(key))
+
+    def merge(self, other):
+        """Adds every count from another sketch (of the same dimensions)."""
+        counters = self.counters
+        for i, value in enumerate(other.counters):
+            if value:
+                counters[i] += value
+        self.total += other.total
+        for key in list(self.candidates) + list(other.candidates):
+            self._offer(key, self.estimate(key))
+
+    def heavy_hitters(self):
+        """list: Up to 'top' tuples of (key, estimated count), most frequent first."""
+        ranked = sorted(((key, self.estimate(key)) for key in self.candidates), key = lambda item: item[1], reverse = True)
+        return ranked[:self.top]
+
+class ChatAggregate:
+    """Messages, unique chatters, command usage and emote frequency over one period."""
+
+    __slots__ = ("start", "messages", "chatters", "commands", "emotes", "_options")
+
+    def __init__(self, start, precision, width, depth, top):
+        self.start = start
+        self.messages = 0
+        self.chatters = HyperLogLog(precision)
+        self._options = (width, depth, top)
+
+        # allocated on first use, most periods of quiet channels have no commands/emotes
+        self.commands = None
+        self.emotes = None
+
+    def sketch(self, name):
+        sketch = getattr(self, name)
+        if sketch is None:
+            sketch = CountMinSketch(*self._options)
+            setattr(self, name, sketch)
+        return sketch
+
+    def add(self, user_id, command, emotes):
+        self.messages += 1
+        self.chatters.add(user_id)
+        if command is not None:
+            self.sketch("commands").add(command)
+        for emote in emotes:
+            self.sketch("emotes").add(emote)
+
+    def merge(self, other):
+        self.messages += other.messages
+        self.chatters.merge(other.chatters)
+        for name in ("commands", "emotes"):
+            sketch = getattr(other, name)
+            if sketch is not None:
+                self.sketch(name).merge(sketch)
+
+    def to_dict(self, duration):
+        return {
+            "start": self.start,
+            "duration": duration,
+            "messages": self.messages,
+            "messages_per_minute": self.messages * 60 / duration if duration else 0,
+            "unique_chatters": self.chatters.count(),
+            "top_commands": self.commands.heavy_hitters() if self.commands is not None else [],
+            "top_emotes": self.emotes.heavy_hitters() if self.emotes is not None else []
+        }
+
+class MixerChatAnalytics:
+    """Streaming per-channel chat analytics over tumbling and sliding windows.
+
+    Assign an instance to :attr:`mixer.chat.MixerChat.analytics` to observe every chat message.
+    Unique chatters are counted with a HyperLogLog and commands/emotes with count-min sketches,
+    so memory per channel is bounded regardless of how busy the channel is.
+
+    Closed tumbling windows are kept in 'windows' and, while metrics are enabled, exported to
+    :data:`mixer.metrics.metrics` (and from there to its sinks).
+    """
+
+    def __init__(self, channel = None, interval = 60, window = 300, slices = 5, history = 60, precision = 10, width = 256, depth = 4, top = 10):
+        """
+        Args:
+            channel (int): Channel id, used as a metrics label.
+            interval (float): Length of the tumbling windows, in seconds.
+            window (float): Length of the sliding window, in seconds.
+            slices (int): Amount of slices the sliding window is made of (it moves one slice at a time).
+            history (int): Amount of closed tumbling windows kept.
+            precision (int): HyperLogLog precision, uses 2^precision bytes per aggregate.
+            width (int): Count-min sketch width.
+            depth (int): Count-min sketch depth.
+            top (int): Amount of heavy hitters tracked per sketch.
+        """
+        self.channel = channel
+        self.interval = interval
+        self.window = window
+        self.slice = window / slices
+        self._options = (precision, width, depth, top)
+
+        now = time.time()
+        self.current = self._aggregate(now - now % interval)
+        self.slices = deque([self._aggregate(now - now % self.slice)], maxlen = slices)
+        self.windows = deque(maxlen = history)
+
+    def _aggregate(self, start):
+        return ChatAggregate(start, *self._options)
+
+    def _advance(self, now):
+
+        # close the tumbling window(s) that ended
+        if now >= self.current.start + self.interval:
+            closed = self.current.to_dict(self.interval)
+            self.windows.append(closed)
+            self.export(closed)
+            self.current = self._aggregate(now - now % self.interval)
+
+        # start a new slice, the oldest one falls out of the sliding window
+        if now >= self.slices[-1].start + self.slice:
+            self.slices.append(self._aggregate(now - now % self.slice))
+
+    def observe(self, message, now = None):
+        """Adds a chat message to the current windows.
+
+        Args:
+            message (MixerChatMessage): The message, its 'command' attribute is set for commands.
+        """
+        now = now if now is not None else time.time()
+        self._advance(now)
+
+        command = message.command
+        emotes = [piece["text"] for piece in message.message_raw["message"] if piece.get("type") == "emoticon"]
+        self.current.add(message.user_id, command, emotes)
+        self.slices[-1].add(message.user_id, command, emotes)
+
+    def sliding(self, now = None):
+        """dict: Aggregates of the sliding window ending now."""
+        now = now if now is not None else time.time()
+        self._advance(now)
+
+        merged = self._aggregate(now - self.window)
+        for aggregate in self.slices:
+            if aggregate.start > now - self.window:
+                merged.merge(aggregate)
+        return merged.to_dict(self.window)
+
+    def snapshot(self, now = None):
+        """dict: The current tumbling window, sliding window and last closed tumbling window."""
+        now = now if now is not None else time.time()
+        self._advance(now)
+        return {
+            "channel": self.channel,
+            "tumbling": self.current.to_dict(now - self.current.start),
+            "sliding": self.sliding(now),
+            "last": self.windows[-1] if self.windows else None
+        }
+
+    def export(self, aggregates):
+        """Exports a closed tumbling window to the metrics gauges."""
+        if not metrics.enabled:
+            return
+
+        channel = self.channel
+        metrics.chat_messages_per_minute.set(aggregates["messages_per_minute"], channel = channel)
+        metrics.chat_unique_chatters.set(aggregates["unique_chatters"], channel = channel)
+
+        # replace the previous heavy hitters, so label cardinality stays bounded by 'top'
+        for kind in ("command", "emote"):
+            metrics.chat_top_items.remove_matching(channel = channel, kind = kind)
+            for key, count in aggregates["top_{}s".format(kind)]:
+                metrics.chat_top_items.set(count, channel = channel, kind = kind, key = key)
@@ -1,11 +1,12 @@
-import aiohttp
-import dateutil.parser
 import json
+import time
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 
 from . import exceptions as MixerExceptions
 from .objects import MixerUser, MixerChannel
+from .metrics import metrics
+from .session import MixerSession
 
 class RequestMethod(Enum):
     GET = 0
@@ -16,23 +17,80 @@ class MixerAPI:
     API_URL = "https://mixer.com/api/v1"
     API_URL_V2 = "https://mixer.com/api/v2"
 
-    def __init__(self, client_id, client_secret):
+    def __init__(self, client_id, client_secret, session = None, cache = None, **kwargs):
+        """
+        Args:
+            client_id (str): OAuth client id.
+            client_secret (str): OAuth client secret.
+            session (MixerSession): Session to share with other MixerAPI instances. Optional.
+            cache (MixerCache): Cache for channel and user lookups, which persists across restarts. Optional.
+            **kwargs: Connection pool options for a new :class:`mixer.session.MixerSession`, if one isn't provided.
+        """
         self.client_id = client_id
         self.client_secret = client_secret
-        self._session = aiohttp.ClientSession(headers = { "Client-ID": self.client_id })
+        self._headers = { "Client-ID": self.client_id }
+        self.session = session if session is not None else MixerSession(**kwargs)
+        self.session.acquire()
+        self.cache = cache
+        self._closed = False
 
     async def close(self):
-        await self._session.close()
+        """Stops using the session, closing it if no other MixerAPI uses it."""
+        if not self._closed:
+            self._closed = True
+            await self.session.release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def pool_stats(self):
+        """dict: Connection pool utilization of the underlying session."""
+        return self.session.stats()
 
-    async def request(self, method, url, parse_json = False, **kwargs):
+    async def request(self, method, url, parse_json = False, route = None, **kwargs):
+
+        if metrics.enabled:
+            started = time.perf_counter()
+            status = "error"
+            try:
+                response = await self._request(method, url, parse_json, **kwargs)
+                status = "200"
+                return response
+            except MixerExceptions.WebException as ex:
+                status = str(ex.status)
+                raise
+            finally:
+                route = route or url.split("?")[0]
+                metrics.api_latency.observe(time.perf_counter() - started, method = method.name, route = route)
+                metrics.api_responses.inc(method = method.name, route = route, status = status)
+
+        return await self._request(method, url, parse_json, **kwargs)
+
+    async def _request(self, method, url, parse_json = False, **kwargs):
+
+        # the client id is sent per request, since the session may be shared by several client ids
+        headers = kwargs.pop("headers", None)
+        kwargs["headers"] = dict(self._headers, **headers) if headers else self._headers
 
         # pick ... based on request type
+        session = self.session.session
         if method is RequestMethod.GET:
-            ctx_mgr = self._session.get(url, **kwargs)
+            ctx_mgr = session.get(url, **kwargs)
         elif method is RequestMethod.POST:
             data = kwargs.pop("data")
-            ctx_mgr = self._session.post(url, json = data, **kwargs)
+            ctx_mgr = session.post(url, json = data, **kwargs)
+
+        self.session.requests += 1
+        self.session.in_flight += 1
+        try:
+            return await self._read_response(ctx_mgr, parse_json)
+        finally:
+            self.session.in_flight -= 1
 
+    async def _read_response(self, ctx_mgr, parse_json):
         async with ctx_mgr as response:
 
             text = await response.text()
@@ -59,32 +117,46 @@ class MixerAPI:
         coro = self.request(RequestMethod.POST, url, **kwargs)
         return await coro
 
-    async def get_channel(self, id_or_token):
+    async def get_channel(self, id_or_token, cached = True):
         """Retrieves a MixerChannel object from username or channel id.
 
         Args:
             id_or_token (str): Username (or id) of Mixer channel.
+            cached (bool): Use the cache (if there's one) instead of requesting channels it holds.
 
         Returns:
             :class:`mixer.objects.MixerChannel`: Channel information.
         """
-        url = "{}/channels/{}".format(self.API_URL, id_or_token)
-        data = await self.get(url, parse_json = True)
+        key = "channel:{}".format(str(id_or_token).lower())
+        data = await self.cache.get(key) if cached and self.cache is not None else None
+        if data is None:
+            url = "{}/channels/{}".format(self.API_URL, id_or_token)
+            data = await self.get(url, parse_json = True, route = "/channels/{id}")
+            if self.cache is not None:
+                # cached under both the id and the token, since either can be looked up
+                self.cache.set("channel:{}".format(data["id"]), data)
+                self.cache.set("channel:{}".format(data["token"].lower()), data)
         channel = MixerChannel(data)
         channel.set_api(self)
         return channel
 
-    async def get_user(self, user_id):
+    async def get_user(self, user_id, cached = True):
         """Retrieves a MixerUser object from a user id.
 
         Args:
             user_id (int): The unique id of a Mixer user.
+            cached (bool): Use the cache (if there's one) instead of requesting users it holds.
 
         Returns:
             :class:`mixer.objects.MixerUser`: User information.
         """
-        url = "{}/users/{}".format(self.API_URL, user_id)
-        data = await self.get(url, parse_json = True)
+        key = "user:{}".format(user_id)
+        data = await self.cache.get(key) if cached and self.cache is not None else None
+        if data is None:
+            url = "{}/users/{}".format(self.API_URL, user_id)
+            data = await self.get(url, parse_json = True, route = "/users/{id}")
+            if self.cache is not None:
+                self.cache.set(key, data)
         user = MixerUser(data)
         user.set_api(self)
         return user
@@ -104,7 +176,7 @@ class MixerAPI:
             "client_secret": self.client_secret,
             "scope": " ".join(scope)
         }
-        response = await self.post(url, data, parse_json = True)
+        response = await self.post(url, data, parse_json = True, route = "/oauth/shortcode")
         return response
 
     async def check_shortcode(self, handle):
@@ -117,7 +189,7 @@ class MixerAPI:
             dict: Shortcode status information.
         """
         url = "{}/oauth/shortcode/check/{}".format(self.API_URL, handle)
-        response = await self.get(url, parse_json = True)
+        response = await self.get(url, parse_json = True, route = "/oauth/shortcode/check/{handle}")
         return response
 
     async def get_token(self, code_or_token, refresh = False):
@@ -143,7 +215,7 @@ class MixerAPI:
             data["grant_type"] = "authorization_code"
             data["code"] = code_or_token
 
-        response = await self.post(url, data, parse_json = True)
+        response = await self.post(url, data, parse_json = True, route = "/oauth/token")
         return response # https://pastebin.com/n1Kjjphq
 
     async def check_token(self, token):
@@ -154,7 +226,7 @@ class MixerAPI:
         """
         url = "{}/oauth/token/introspect".format(self.API_URL)
         data = { "token": token }
-        response = await self.post(url, data, parse_json = True)
+        response = await self.post(url, data, parse_json = True, route = "/oauth/token/introspect")
         return response # https://pastebin.com/SEd6Y2Jz
 
     async def get_broadcast(self, channel_id):
@@ -164,7 +236,7 @@ class MixerAPI:
             channel_id (int): Unique channel ID number.
         """
         url = "{}/channels/{}/broadcast".format(self.API_URL, channel_id)
-        response = await self.get(url, parse_json = True)
+        response = await self.get(url, parse_json = True, route = "/channels/{id}/broadcast")
         return response
 
     async def get_uptime(self, channel_id):
@@ -181,6 +253,7 @@ class MixerAPI:
             return None
 
         # determine the streams start time and current time
+        import dateutil.parser # imported on first use, it's slow to import
         started = dateutil.parser.parse(broadcast["startedAt"])
         now = datetime.now(timezone.utc)
 
@@ -192,19 +265,19 @@ class MixerAPI:
     async def get_leaderboard(self, type, channel_id, limit = 10):
         # type format: [sparks, embers]-[weekly, monthly, yearly, alltime]
         url = "{}/leaderboards/{}/channels/{}?limit={}".format(self.API_URL_V2, type, channel_id, limit)
-        response = await self.get(url, parse_json = True)
+        response = await self.get(url, parse_json = True, route = "/v2/leaderboards/{type}/channels/{id}")
         return response
 
     async def get_chatters(self, channel_id):
         url = "{}/chats/{}/users".format(self.API_URL_V2, channel_id)
-        response = await self.get(url, parse_json = True)
+        response = await self.get(url, parse_json = True, route = "/v2/chats/{id}/users")
         return response
 
     async def get_user_services(self, oauth):
         # NOTE: requires "user:details:self" scope
         await oauth.ensure_active()
         url = "{}/users/{}/links".format(self.API_URL, oauth.user_id)
-        response = await self.get(url, parse_json = True, headers = oauth.header)
+        response = await self.get(url, parse_json = True, route = "/users/{id}/links", headers = oauth.header)
         return response
 
     async def get_user_service(self, service, oauth):
@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+class MixerBatchWriter:
+    """Buffers items on the event loop and writes them in batches on a single background thread.
+
+    Used by :class:`mixer.chatlog.MixerChatLog` and :class:`mixer.cache.MixerCache`, so writing to
+    disk never blocks the event loop. Every file/database operation of the owner should go through
+    :meth:`run`, so they all happen on the same thread.
+    """
+
+    def __init__(self, write, batch_size, flush_interval, pending = list):
+        """
+        Args:
+            write (function): Called on the writer thread with each batch (a 'pending' container).
+            batch_size (int): Pending items which trigger an immediate flush.
+            flush_interval (float): Maximum seconds an item waits before being written.
+            pending (type): Container items are buffered in (ex: list, or dict to coalesce writes by key).
+        """
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._new_pending = pending
+        self.pending = pending()
+        self._flush_handle = None
+        self._flush_tasks = set()
+        self.executor = ThreadPoolExecutor(max_workers = 1)
+
+    def added(self):
+        """Schedules a flush, call after adding items to 'pending'."""
+        if len(self.pending) >= self.batch_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_event_loop()
+            self._flush_handle = loop.call_later(self.flush_interval, self._schedule_flush)
+
+    def _schedule_flush(self):
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self):
+        """Writes every pending item."""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if len(self.pending) == 0:
+            return
+
+        batch, self.pending = self.pending, self._new_pending()
+        await self.run(self.write, batch)
+
+    async def run(self, func, *args):
+        """Runs a function on the writer thread.
+
+        Returns:
+            The function's result.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def close(self, func = None):
+        """Writes pending items, runs a last function on the writer thread (ex: closing files) and stops the thread."""
+        await self.flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks)
+        if func is not None:
+            await self.run(func)
+        self.executor.shutdown()
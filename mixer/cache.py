@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+from .batching import MixerBatchWriter
+
+class MixerCache:
+    """Persistent cache for REST lookups (see :class:`mixer.api.MixerAPI`), stored in SQLite.
+
+    Entries expire after a TTL per kind of entry, the database is bounded to 'max_entries'
+    (entries closest to expiring are evicted first) and recently used entries are also kept in
+    memory. Writes are buffered and written in batches on a background thread (write-behind),
+    so caching a lookup never blocks the event loop. Since the cache survives restarts, a bot
+    comes back up with its lookups already cached.
+
+    Example:
+        cache = MixerCache("mixer-cache.db")
+        api = MixerAPI(client_id, client_secret, cache = cache)
+        ...
+        await cache.close()
+    """
+
+    TTLS = { "channel": 300, "user": 3600 }
+
+    def __init__(self, path, ttls = None, default_ttl = 600, max_entries = 100000, memory_entries = 1000, batch_size = 200, flush_interval = 1.0):
+        """
+        Args:
+            path (str): SQLite database file, created if it doesn't exist (":memory:" for a cache which isn't persisted).
+            ttls (dict): Kind of entry (ex: 'channel', 'user') -> seconds entries stay valid. Merged with TTLS.
+            default_ttl (float): Seconds entries of other kinds stay valid.
+            max_entries (int): Maximum amount of entries kept in the database.
+            memory_entries (int): Maximum amount of entries also kept in memory.
+            batch_size (int): Pending writes which trigger an immediate flush.
+            flush_interval (float): Maximum seconds a write waits before being written.
+        """
+        self.path = path
+        self.ttls = dict(self.TTLS, **(ttls or dict()))
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        # key -> (expires, serialized value), most recently used last. values are kept serialized,
+        # so callers get their own copy and changing it doesn't change the cache
+        self._memory = OrderedDict()
+
+        # pending writes are key -> (expires, serialized value), so repeated writes to a key coalesce.
+        # sqlite is only used from the writer's thread
+        self._writer = MixerBatchWriter(self._write_batch, batch_size, flush_interval, pending = dict)
+        self._db = self._writer.executor.submit(self._open).result()
+
+        self.hits = 0
+        self.misses = 0
+        self._closed = False
+
+    def _open(self):
+        db = sqlite3.connect(self.path, check_same_thread = False)
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)")
+        db.commit()
+
+        # counted once, then kept up to date by _write_batch
+        self._rows = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return db
+
+    def ttl(self, key):
+        """float: Seconds an entry stays valid, based on its kind (the part of the key before ':')."""
+        return self.ttls.get(key.split(":", 1)[0], self.default_ttl)
+
+    def _remember(self, key, expires, value):
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last = False)
+
+    async def get(self, key):
+        """Gets a cached value.
+
+        Args:
+            key (str): Cache key (ex: 'channel:123').
+
+        Returns:
+            The cached value, or None if it isn't cached or expired.
+        """
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is None:
+            pending = self._writer.pending.get(key)
+            if pending is not None:
+                entry = pending
+            else:
+                row = await self._writer.run(self._select, key)
+                entry = tuple(row) if row is not None else None
+            if entry is not None:
+                self._remember(key, *entry)
+        else:
+            self._memory.move_to_end(key)
+
+        if entry is None or entry[0] <= now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(entry[1])
+
+    def _select(self, key):
+        return self._db.execute("SELECT expires, value FROM entries WHERE key = ?", (key,)).fetchone()
+
+    def set(self, key, value, ttl = None):
+        """Caches a (json serializable) value. Doesn't block, it's written to the database later.
+
+        Args:
+            key (str): Cache key (ex: 'channel:123').
+            value: The value to cache.
+            ttl (float): Seconds the value stays valid, defaults to the TTL of the key's kind.
+        """
+        entry = (time.time() + (ttl if ttl is not None else self.ttl(key)), json.dumps(value))
+        self._remember(key, *entry)
+        self._writer.pending[key] = entry
+        self._writer.added()
+
+    def invalidate(self, key):
+        """Removes a value from the cache."""
+        self._memory.pop(key, None)
+        self._writer.pending[key] = (0, "null") # written like any other entry, and evicted as expired
+        self._writer.added()
+
+    async def flush(self):
+        """Writes every pending value to the database."""
+        await self._writer.flush()
+
+    def _write_batch(self, batch):
+        """Runs on the writer thread."""
+        db = self._db
+        keys = list(batch)
+        with db:
+            # only new keys add rows, replaced ones don't
+            existing = 0
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                existing += db.execute("SELECT COUNT(*) FROM entries WHERE key IN ({})".format(", ".join("?" * len(chunk))), chunk).fetchone()[0]
+            db.executemany("INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                ((key, value, expires) for key, (expires, value) in batch.items()))
+            self._rows += len(keys) - existing
+            self._rows -= db.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),)).rowcount
+
+            # evict the entries closest to expiring, beyond the size limit
+            excess = self._rows - self.max_entries
+            if excess > 0:
+                self._rows -= db.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY expires LIMIT ?)", (excess,)).rowcount
+
+    def __len__(self):
+        """int: Amount of entries in the database, as of the last flush."""
+        return self._rows
+
+    async def close(self):
+        """Writes pending values and closes the database."""
+        if self._closed:
+            return
+        self._closed = True
+        await self._writer.close(self._db.close)
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import struct
+import time
+
+# file header, followed by records of: timestamp (double), direction (byte), length (uint32), raw packet
+CAPTURE_MAGIC = b"MXCAP1\n"
+RECORD_HEADER = struct.Struct("<dBI")
+
+INBOUND = 0
+OUTBOUND = 1
+
+class MixerPacketRecorder:
+    """Appends every packet sent/received by a websocket to a capture file.
+
+    Assign an instance to the 'recorder' attribute of :class:`mixer.chat.MixerChat` or
+    :class:`mixer.constellation.MixerConstellation` before starting it.
+    """
+
+    def __init__(self, path, buffer_size = 64 * 1024):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "ab", buffering = buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+
+    def record(self, direction, raw):
+        """Writes a packet to the capture.
+
+        Args:
+            direction (int): INBOUND or OUTBOUND.
+            raw (str): The packet, exactly as it was sent over the websocket.
+        """
+        data = raw.encode() if isinstance(raw, str) else raw
+        self._file.write(RECORD_HEADER.pack(time.time(), direction, len(data)))
+        self._file.write(data)
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def read_capture(path):
+    """Reads the packets stored in a capture file.
+
+    Args:
+        path (str): Path to a file written by :class:`MixerPacketRecorder`.
+
+    Yields:
+        tuple: Timestamp, direction (INBOUND/OUTBOUND) and the raw packet (str).
+    """
+    with open(path, "rb") as file:
+        if file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError("'{}' is not a packet capture.".format(path))
+
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return # end of file (or a record cut off while being written)
+            timestamp, direction, length = RECORD_HEADER.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            yield timestamp, direction, data.decode()
+
+class MixerReplaySocket:
+    """Stands in for :class:`mixer.ws.MixerWS` during a replay, collecting outgoing packets."""
+
+    def __init__(self):
+        self.sent = list()
+
+    async def send_packet(self, packet):
+        self.sent.append(packet)
+
+    async def receive_packet(self):
+        raise RuntimeError("packets are fed to the client by replay() during a replay.")
+
+async def replay(client, path, speed = 1.0):
+    """Feeds the inbound packets of a capture to a chat or Constellation client.
+
+    Packets are passed to client.handle_packet in the order they were captured, so every
+    handler and command runs against the same traffic each time.
+
+    Args:
+        client: A :class:`mixer.chat.MixerChat` or :class:`mixer.constellation.MixerConstellation`.
+        path (str): Path to a capture file.
+        speed (float): Playback speed relative to the capture (ex: 10 for 10x). None replays as fast as possible.
+
+    Returns:
+        :class:`MixerReplaySocket`: The socket used during the replay, containing the packets the client sent.
+    """
+
+    socket = MixerReplaySocket()
+    websocket, client.websocket = getattr(client, "websocket", None), socket
+
+    # sent packets are only recorded, so they shouldn't be paced by the chat's rate limit
+    outbound = getattr(client, "outbound", None)
+    if outbound is not None:
+        rate, outbound.rate = outbound.rate, None
+    try:
+        await _replay(client, path, speed)
+        if outbound is not None:
+            await outbound.drain()
+    finally:
+        client.websocket = websocket
+        if outbound is not None:
+            outbound.rate = rate
+    return socket
+
+async def _replay(client, path, speed):
+
+    loop = asyncio.get_event_loop()
+    started = loop.time()
+    first = None
+
+    for timestamp, direction, raw in read_capture(path):
+        if direction != INBOUND:
+            continue
+
+        # wait until this packet is due (relative to the first packet)
+        if speed:
+            if first is None:
+                first = timestamp
+            delay = (timestamp - first) / speed - (loop.time() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await client.handle_packet(json.loads(raw))
+
+    # wait for any commands triggered by the capture to complete
+    commands = getattr(client, "commands", None)
+    if commands is not None and commands.tasks:
+        await asyncio.gather(*commands.tasks, return_exceptions = True)
@@ -1,11 +1,23 @@
 import inspect
-import requests
 import shlex
 import asyncio
+import logging
+import time
 from enum import Enum
 
 from .ws import MixerWS
 from .objects import MixerChatMessage
+from .events import chat_event
+from .pipeline import MixerPacketPipeline
+from .outbound import MixerOutboundQueue
+from .connection import MixerChatConnection
+from .scheduler import scheduler as default_scheduler
+from .registry import MixerEventRegistry
+from .history import MixerMessageHistory
+from .cooldown import MixerCooldowns
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 class MixerChat:
 
@@ -31,12 +43,16 @@ class MixerChat:
             sig = inspect.signature(func)
             params = sig.parameters
             command = {
+                "name": name,
                 "function": func,
                 "signature": sig,
                 "description": func.__doc__, # command docstring (should be a brief description)
                 "params": list(params.keys())[1:], # list of parameter names
                 "param_count": len(params) - 1, # ignore data parameter (required)
                 "roles": kwargs.pop("roles", []), # list of roles permitted to use this command
+                "cooldown": kwargs.pop("cooldown", None), # seconds between uses by anyone
+                "user_cooldown": kwargs.pop("user_cooldown", None), # seconds between uses by the same user
+                "role_cooldowns": kwargs.pop("role_cooldowns", None), # role -> user cooldown, 0 bypasses cooldowns
                 "aliases": kwargs.pop("aliases", []) + [name] # list of shortcuts to this, basically
             }
 
@@ -123,11 +139,40 @@ class MixerChat:
 
             return str
 
-        async def trigger(self, command, message, params):
-            response = await command["function"](message, *params)
-            if response is not None:
-                response = "@{} {}".format(message.username, response)
-                await self.chat.send_message(response)
+        async def trigger(self, command, message, params, trace = None):
+            outcome = "error"
+            try:
+                if trace is not None:
+                    trace.mark("queued")
+                    self.tracer.start_profiler(trace)
+                    try:
+                        response = await command["function"](message, *params)
+                    finally:
+                        self.tracer.stop_profiler(trace)
+                        trace.mark("handler")
+                elif metrics.enabled:
+                    started = time.perf_counter()
+                    try:
+                        response = await command["function"](message, *params)
+                    finally:
+                        metrics.command_handler.observe(time.perf_counter() - started, command = command["name"])
+                else:
+                    response = await command["function"](message, *params)
+
+                if response is not None:
+                    response = "@{} {}".format(message.username, response)
+                    await self.chat.send_message(response)
+                outcome = "ok"
+
+            finally:
+                # finished even if the handler raised, so its trace/profile aren't lost
+                if trace is not None:
+                    if outcome == "ok":
+                        trace.mark("send")
+                    trace.outcome = outcome
+                    if metrics.enabled:
+                        metrics.command_handler.observe(dict(trace.spans)["handler"], command = command["name"])
+                    self.tracer.finish(trace)
 
         async def handle(self, message):
             """Handle/parse a chat message as a command.
@@ -144,71 +189,117 @@ class MixerChat:
             if message.text[:pl] != self.prefix:
                 return False
 
-            # handle it as a command
-            try:
-                parsed = shlex.split(message.text) # split string by whitespace and account for quotes
-                name = parsed[0][pl:].lower() # the name of the command -> 0th item with command prefix removed
-                parameters = parsed[1:] # remove first parsed item, because its the command name
-            except:
-                await self.chat.send_message("an error occurred while parsing that command.")
-                return True
+            started = time.perf_counter() if metrics.enabled else None
+            trace = self.tracer.begin(message) if self.tracer is not None else None
 
-            # make sure the command exists
-            command = self.get(name, len(parameters))
-            if command is None:
-                await self.chat.send_message("unrecognized command '{}'.".format(name))
-                return True
-            elif command is False:
-                await self.chat.send_message("invalid parameter count for command '{}'.".format(name))
-                return True
-
-            # if we have "roles", verify the user has permission to use command
-            if len(command["roles"]) > 0:
-                permitted = False
-                for role in command["roles"]:
-                    if message.has_role(role):
-                        permitted = True
-                        break
-                if not permitted:
-                    await self.chat.send_message("@{} you are not permitted to use this command.".format(message.username))
+            # traces of commands which aren't dispatched are finished here, with the reason why
+            outcome = "error"
+            phase = "parse"
+            try:
+                # handle it as a command
+                try:
+                    parsed = shlex.split(message.text) # split string by whitespace and account for quotes
+                    name = parsed[0][pl:].lower() # the name of the command -> 0th item with command prefix removed
+                    parameters = parsed[1:] # remove first parsed item, because its the command name
+                except:
+                    await self.chat.send_message("an error occurred while parsing that command.")
+                    outcome = "parse_error"
                     return True
 
+                # make sure the command exists
+                command = self.get(name, len(parameters))
+                if command is None:
+                    await self.chat.send_message("unrecognized command '{}'.".format(name))
+                    outcome = "unknown_command"
+                    return True
+                elif command is False:
+                    await self.chat.send_message("invalid parameter count for command '{}'.".format(name))
+                    outcome = "invalid_parameter_count"
+                    return True
 
-            # handle parameter type annotations
-            ParamType = self.chat.ParamType
-            param_names = command["params"]
-            param_objects = command["signature"].parameters
-            for i in range(len(parameters)):
-                param_object = param_objects[param_names[i]]
-                if param_object.annotation == ParamType.NUMBER or param_object.annotation == ParamType.POSITIVE_NUMBER:
-                    try:
-                        parameters[i] = float(parameters[i])
-                    except:
-                        await self.chat.send_message("the '{}' parameter must be numeric.".format(param_names[i]))
-                        return True
-                    if param_object.annotation == ParamType.POSITIVE_NUMBER and parameters[i] <= 0:
-                        await self.chat.send_message("the '{}' parameter must be a positive number.".format(param_names[i]))
-                        return True
-                elif param_object.annotation == ParamType.MIXER_USER:
-                    if parameters[i][:1] != "@":
-                        await self.chat.send_message("the '{}' parameter must be a tagged user.".format(param_names[i]))
-                        return True
-                    try:
-                        channel = await self.chat.api.get_channel(parameters[i][1:])
-                        parameters[i] = channel.user
-                    except:
-                        await self.chat.send_message("the '{}' parameter must be a tagged user.".format(param_names[i]))
+                message.command = command["name"]
+                if trace is not None:
+                    trace.command = command["name"]
+                    trace.mark("parse")
+                    phase = "permissions"
+
+                # if we have "roles", verify the user has permission to use command
+                if len(command["roles"]) > 0:
+                    permitted = False
+                    for role in command["roles"]:
+                        if message.has_role(role):
+                            permitted = True
+                            break
+                    if not permitted:
+                        await self.chat.send_message("@{} you are not permitted to use this command.".format(message.username))
+                        outcome = "not_permitted"
                         return True
 
-            # NOTE:
-            # the asyncio.ensure_future function is used rather than a standard await
-            # since the executed command may contain async sleeping,
-            # awaiting the call may freeze handling of incoming messages
-            # https://docs.python.org/3/library/asyncio-future.html#asyncio.ensure_future
-            coro = self.trigger(command, message, parameters)
-            task = asyncio.ensure_future(coro)
+                # commands on cooldown are ignored, replying would defeat the purpose of the cooldown
+                remaining = self.cooldowns.check(command, message)
+                if remaining:
+                    await self.chat.registry.dispatch("command_cooldown", message, command["name"], remaining)
+                    outcome = "cooldown"
+                    return True
 
-            return True
+                if trace is not None:
+                    trace.mark("permissions")
+                    phase = "resolve"
+
+                # handle parameter type annotations
+                ParamType = self.chat.ParamType
+                param_names = command["params"]
+                param_objects = command["signature"].parameters
+                for i in range(len(parameters)):
+                    param_object = param_objects[param_names[i]]
+                    if param_object.annotation == ParamType.NUMBER or param_object.annotation == ParamType.POSITIVE_NUMBER:
+                        try:
+                            parameters[i] = float(parameters[i])
+                        except:
+                            await self.chat.send_message("the '{}' parameter must be numeric.".format(param_names[i]))
+                            outcome = "invalid_parameter"
+                            return True
+                        if param_object.annotation == ParamType.POSITIVE_NUMBER and parameters[i] <= 0:
+                            await self.chat.send_message("the '{}' parameter must be a positive number.".format(param_names[i]))
+                            outcome = "invalid_parameter"
+                            return True
+                    elif param_object.annotation == ParamType.MIXER_USER:
+                        if parameters[i][:1] != "@":
+                            await self.chat.send_message("the '{}' parameter must be a tagged user.".format(param_names[i]))
+                            outcome = "invalid_parameter"
+                            return True
+                        try:
+                            channel = await self.chat.api.get_channel(parameters[i][1:])
+                            parameters[i] = channel.user
+                        except:
+                            await self.chat.send_message("the '{}' parameter must be a tagged user.".format(param_names[i]))
+                            outcome = "invalid_parameter"
+                            return True
+
+                if trace is not None:
+                    trace.mark("resolve")
+
+                # NOTE:
+                # the asyncio.ensure_future function is used rather than a standard await
+                # since the executed command may contain async sleeping,
+                # awaiting the call may freeze handling of incoming messages
+                # https://docs.python.org/3/library/asyncio-future.html#asyncio.ensure_future
+                self.cooldowns.start(command, message)
+                coro = self.trigger(command, message, parameters, trace)
+                task = asyncio.ensure_future(coro)
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+                outcome = None # the trace is finished by trigger
+
+                if started is not None:
+                    metrics.command_dispatch.observe(time.perf_counter() - started, command = command["name"])
+
+                return True
+            finally:
+                if trace is not None and outcome is not None:
+                    trace.mark(phase)
+                    trace.outcome = outcome
+                    self.tracer.finish(trace)
 
         def __init__(self, chat, prefix):
 
@@ -216,17 +307,22 @@ class MixerChat:
             self.prefix = prefix
             self.commands = dict()
 
+            # optional MixerCommandTracer, used to time each phase of a command
+            self.tracer = None
+
+            # command tasks which are still running
+            self.tasks = set()
+
+            # global/per-user/per-role cooldowns of commands which declare them
+            self.cooldowns = MixerCooldowns()
+
             # initialize default commands
             for name, methods in DEFAULT_COMMANDS.items():
                 for method in methods:
                     self.add(name, method)
 
-    # used to uniquely identify 'method' packets
-    packet_id = 0
-
-    # used to store references to functions (see __call__ and call_func)
-    funcs = dict()
-    callbacks = dict()
+    # maximum length of a chat message/whisper
+    MESSAGE_LIMIT = 360
 
     # map events to functions
     event_map = {
@@ -245,31 +341,110 @@ class MixerChat:
         "DeleteSkillAttribution": "skill_cancelled"
     }
 
+    websocket = None
+
+    def __init__(self, registry = None, history_size = 500):
+
+        # used to uniquely identify 'method' packets
+        self.packet_id = 0
+
+        # reply callbacks, keyed by 'method' packet id
+        self.callbacks = dict()
+
+        # optional MixerPacketRecorder, captures traffic on the websocket
+        self.recorder = None
+
+        # MixerWS options (ex: compression, max_size, max_queue) for every connection
+        self.ws_options = dict()
+
+        # optional MixerChatLog, archives every chat message
+        self.chat_log = None
+
+        # optional MixerFloodDetector, moderates floods before messages are handled
+        self.flood = None
+
+        # optional MixerChatFilter, checks messages for banned phrases and domains
+        self.filter = None
+
+        # rate limited queue for outgoing packets (see create)
+        self.outbound = None
+
+        # additional send-only connections, outbound packets are spread across them (see add_connection)
+        self.connections = list()
+        self.oauth = None
+
+        # amount of chat messages received, used for activity conditions (ex: scheduled announcements)
+        self.message_count = 0
+
+        # optional MixerChatAnalytics, aggregates message/chatter/command/emote statistics
+        self.analytics = None
+
+        # recent messages, used to resolve DeleteMessage/PurgeMessage/ClearMessages events
+        self.history = MixerMessageHistory(history_size)
+
+        # event handlers (see __call__ and call_func), may be shared with other chats
+        aliases = dict(self.event_map, ChatMessage = "handle_message")
+        if registry is None:
+            registry = MixerEventRegistry(aliases)
+        else:
+            registry.add_aliases(aliases) # so shared registries resolve handler names (ex: 'user_joined') too
+        self.registry = registry
+
     @classmethod
-    async def create(cls, api, username_or_id, command_prefix = "!"):
+    async def create(cls, api, username_or_id, command_prefix = "!", registry = None, history_size = 500, rate = 5, burst = 10, **kwargs):
+        """Creates a chat client for a channel.
+
+        Args:
+            api (MixerAPI): Mixer API wrapper.
+            username_or_id (str): Username (or id) of the Mixer channel.
+            command_prefix (str): Prefix used to identify chat commands.
+            registry (MixerEventRegistry): Event handlers to share with other chats. Optional.
+            history_size (int): Amount of recent messages kept to resolve moderation events.
+            rate (float): Packets sent per second on average, None disables rate limiting.
+            burst (int): Packets which may be sent back to back after being idle.
+            **kwargs: Overload thresholds passed to :class:`mixer.pipeline.MixerPacketPipeline`.
+        """
 
-        self = MixerChat()
+        self = MixerChat(registry, history_size)
         self.api = api
         self.channel = await self.api.get_channel(username_or_id)
         self.commands = self.ChatCommands(self, command_prefix)
+        self.pipeline = MixerPacketPipeline(command_prefix, **kwargs)
+        self.outbound = MixerOutboundQueue(self._send_packet, rate, burst)
 
         return self
 
-    def __call__(self, method):
-        if inspect.iscoroutinefunction(method):
-            self.funcs[method.__name__] = method
+    def __call__(self, method = None, **kwargs):
+        """Registers an event handler, named after the event (ex: 'user_joined').
 
-    async def call_func(self, name, *args):
+        Can be used as @chat, or as @chat(order = 1, roles = ["Mod"]) to pass
+        ordering/filter options to :meth:`mixer.registry.MixerEventRegistry.add`.
+        """
+        if method is None:
+            return lambda f: self(f, **kwargs)
+        self.registry.add(method.__name__, method, **kwargs)
+        return method
 
-        # make sure the function exists
-        # these are added via __call__ (@instance_name decorator)
-        if not name in self.funcs: return
+    def on(self, name, **kwargs):
+        """Decorator which registers an event handler for the given event name.
+
+        Args:
+            name (str): Handler name (ex: 'user_joined') or packet event name (ex: 'UserJoin').
+            **kwargs: Ordering/filter options, see :meth:`mixer.registry.MixerEventRegistry.add`.
+        """
+        def decorator(func):
+            self.registry.add(name, func, **kwargs)
+            return func
+        return decorator
 
-        # get a reference to the function
-        func = self.funcs[name]
+    async def call_func(self, name, *args):
+        """Invokes every handler registered for an event.
 
-        # call the function
-        await func(*args)
+        Args:
+            name (str): Handler name or packet event name.
+            *args: Arguments passed to each handler.
+        """
+        await self.registry.dispatch(name, *args)
 
     async def send_method_packet(self, method, *args):
         """Sends a 'method' type packet to the Mixer chat websocket.
@@ -287,10 +462,105 @@ class MixerChat:
             "arguments": list(args),
             "id": self.packet_id
         }
-        await self.websocket.send_packet(packet)
+
+        # claim the id before awaiting, so concurrent sends never share one
         self.packet_id += 1
+
+        # authentication can't wait behind queued messages (ex: after reconnecting)
+        if self.outbound is None or method == "auth":
+            await self.websocket.send_packet(packet)
+            return packet["id"]
+
+        # only queued, so handling packets never waits on the rate limit
+        self.route().put(packet).add_done_callback(self._packet_sent)
         return packet["id"]
 
+    def queue_method_packet(self, method, *args):
+        """Queues a 'method' type packet, for callers which need to know when it was actually sent.
+
+        Args:
+            method (str): The method name.
+            *args: List of arguments to pass to the server for this method.
+
+        Returns:
+            asyncio.Future: Resolved with the packet's id once it was sent (or with the exception sending it raised).
+        """
+        packet = {
+            "type": "method",
+            "method": method,
+            "arguments": list(args),
+            "id": self.packet_id
+        }
+        self.packet_id += 1
+
+        # without an outbound queue (ex: before start), the packet is sent directly
+        queue = self.route()
+        if queue is None:
+            return asyncio.ensure_future(self._send_direct(packet))
+        return queue.put(packet)
+
+    def _packet_sent(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("Failed to send chat packet to channel %s: %r", self.channel.id, future.exception())
+
+    async def _send_packet(self, packet):
+        await self.websocket.send_packet(packet)
+
+    async def _send_direct(self, packet):
+        await self.websocket.send_packet(packet)
+        return packet["id"]
+
+    def route(self):
+        """Picks the least loaded outbound queue, out of the primary connection's and the send connections'.
+
+        Returns:
+            :class:`mixer.outbound.MixerOutboundQueue`: Queue to send the next packet with, or None if there's no queue yet.
+        """
+        queue = self.outbound
+        if self.connections:
+            connection = min((c for c in self.connections if c.authenticated), key = lambda c: c.load, default = None)
+            if connection is not None and (queue is None or connection.load < queue.backlog):
+                queue = connection.outbound
+        return queue
+
+    async def add_connection(self, oauth = None, rate = 5, burst = 10):
+        """Opens an additional connection which outbound packets are spread across.
+
+        Events are only read from the primary connection (see start), so they aren't handled twice.
+        Moderation packets may be routed to any connection, so every identity should be a moderator.
+
+        Args:
+            oauth (MixerOAuth): Identity to authenticate as. Defaults to the one the chat was started with.
+            rate (float): Packets the connection sends per second on average.
+            burst (int): Packets the connection may send back to back after being idle.
+
+        Returns:
+            :class:`mixer.connection.MixerChatConnection`: The authenticated connection, None if authentication failed.
+        """
+        oauth = oauth if oauth is not None else self.oauth
+        if oauth is None:
+            raise RuntimeError("add_connection needs an oauth identity, or the chat to be started first.")
+        url = "{}/chats/{}".format(self.api.API_URL, self.channel.id)
+        chat_info = await self.api.get(url, parse_json = True, headers = oauth.header, route = "/chats/{id}")
+
+        # spread connections across the chat servers
+        endpoints = chat_info["endpoints"]
+        endpoint = endpoints[(len(self.connections) + 1) % len(endpoints)]
+
+        connection = MixerChatConnection(self, oauth, rate, burst)
+        if not await connection.connect(endpoint, chat_info["authkey"]):
+            await connection.close(0)
+            return None
+
+        self.connections.append(connection)
+        return connection
+
+    async def remove_connection(self, connection, timeout = None):
+        """Closes a send connection, after sending what's queued on it (for up to 'timeout' seconds)."""
+        if connection in self.connections:
+            self.connections.remove(connection)
+        await connection.close(timeout)
+
     def register_method_callback(self, id, callback):
         """Creates a callback to handle replies to a method packet.
 
@@ -309,9 +579,9 @@ class MixerChat:
             oauth (MixerOAuth): Wrapper for access/refresh tokens.
         """
 
+        self.oauth = oauth
         url = "{}/chats/{}".format(self.api.API_URL, self.channel.id)
-        response = requests.get(url, headers = oauth.header)
-        chat_info = response.json() # https://pastebin.com/Z3RyUgBh
+        chat_info = await self.api.get(url, parse_json = True, headers = oauth.header, route = "/chats/{id}") # https://pastebin.com/Z3RyUgBh
 
         # authentication callback (executed when w received reply for 'auth' method)
         async def auth_callback(data):
@@ -324,63 +594,250 @@ class MixerChat:
             self.register_method_callback(auth_packet_id, auth_callback)
 
         # establish websocket connection and receive welcome packet
-        self.websocket = MixerWS(chat_info["endpoints"][0])
+        self.websocket = MixerWS(chat_info["endpoints"][0], recorder = self.recorder, **self.ws_options)
         self.websocket.on_connected = connected_callback
         await self.websocket.connect()
 
-        # infinite loop to handle future packets from server
-        while True:
+        await self.listen()
 
-            # receive a packet from the server
-            packet = await self.websocket.receive_packet()
+    async def listen(self):
+        """Handles packets from the connected websocket in priority order until it's closed."""
 
-            # handle 'event' packets from server
-            if packet["type"] == "event":
+        # the prefix may have been changed since the chat was created
+        self.pipeline.prefix = self.commands.prefix
 
-                # custom handling for chat messages (commands and stuff)
-                if packet["event"] == "ChatMessage":
-                    message = MixerChatMessage(packet["data"])
-                    message.chat = self
-                    message.api = self.api
-                    message.handled = await self.commands.handle(message)
-                    await self.call_func("handle_message", message)
-                    continue
+        metrics.inbound_depth.set_function(lambda: self.pipeline.depth, channel = self.channel.id)
+        if self.outbound is not None:
+            metrics.outbound_depth.set_function(lambda: self.outbound.depth + sum(c.outbound.depth for c in self.connections), channel = self.channel.id)
+        reader = asyncio.ensure_future(self._read_packets())
+        try:
+            while True:
+                packet = await self.pipeline.get()
+                if packet is None:
+                    break
+                await self.handle_packet(packet)
 
-                # call corresponding event handler
-                if packet["event"] in self.event_map:
-                    func_name = self.event_map[packet["event"]]
-                    await self.call_func(func_name, packet["data"])
+            # re-raise whatever ended the connection
+            await reader
+        finally:
+            reader.cancel()
+            metrics.inbound_depth.remove(channel = self.channel.id)
+            metrics.outbound_depth.remove(channel = self.channel.id)
 
-                continue
+    async def close(self, timeout = 5):
+        """Shuts the chat down: sends queued packets, cancels running commands and closes every connection.
 
-            # handle 'reply' packets from server
-            if packet["type"] == "reply":
+        Args:
+            timeout (float): Seconds to wait for queued packets to be sent.
+        """
+        queues = [self.outbound] if self.outbound is not None else []
+        queues.extend(connection.outbound for connection in self.connections)
+        if queues:
+            await asyncio.gather(*(queue.drain(timeout) for queue in queues))
+
+        tasks = list(self.commands.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
+
+        for connection in list(self.connections):
+            await self.remove_connection(connection, 0)
+        if self.outbound is not None:
+            self.outbound.close()
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def _read_packets(self):
+        """Moves packets from the websocket into the pipeline as fast as they arrive."""
+        try:
+            while True:
+                packet = await self.websocket.receive_packet()
+                if metrics.enabled:
+                    metrics.chat_packets.inc(event = packet.get("event", packet.get("type")))
+                self.pipeline.put(packet)
+        except Exception:
+            if not self.websocket.closing:
+                raise
+            # closed by close(), so start/listen return normally
+        finally:
+            self.pipeline.close()
+
+    async def handle_packet(self, packet):
+        """Handles a single packet received from the chat server.
 
-                # see if there's a reply callback for this packet
-                callback = self.callbacks.pop(packet["id"], None)
-                if callback is not None:
+        Args:
+            packet (dict): Decoded packet from the chat websocket.
+        """
 
-                    # invoke callback with data from reply packet
-                    response = packet.get("data", packet)
-                    await callback(response)
+        # handle 'event' packets from server
+        if packet["type"] == "event":
+
+            # custom handling for chat messages (commands and stuff)
+            if packet["event"] == "ChatMessage":
+                message = MixerChatMessage(packet["data"])
+                message.chat = self
+                message.api = self.api
+                self.message_count += 1
+                self.history.add(message)
+                if self.chat_log is not None:
+                    self.chat_log.append(message)
+
+                # moderated floods/spam don't reach commands or handlers
+                if self.flood is not None:
+                    reason = self.flood.check(message)
+                    if reason is not None:
+                        await self.registry.dispatch("flood_detected", message, reason)
+                        if await self.flood.enforce(self, message, reason):
+                            return
+
+                if self.filter is not None:
+                    matches = self.filter.scan(message)
+                    if matches:
+                        await self.registry.dispatch("filter_matched", message, matches)
+                        if await self.filter.enforce(self, message, matches):
+                            return
+
+                message.handled = await self.commands.handle(message)
+                if self.analytics is not None:
+                    self.analytics.observe(message)
+                await self.registry.dispatch("ChatMessage", message)
+                return
 
-                continue
+            # resolve the messages affected by moderation events, handlers receive them as a 2nd argument
+            # (history is updated whether or not there are handlers)
+            event, data = packet["event"], packet["data"]
+            if event == "DeleteMessage":
+                resolved = (self.history.delete(data.get("id")),)
+            elif event == "PurgeMessage":
+                resolved = (self.history.purge(data.get("user_id")),)
+            elif event == "ClearMessages":
+                resolved = (self.history.clear(),)
+            else:
+                resolved = ()
+
+            # events are only decoded into their typed event class if something handles them
+            if self.registry.handlers(event):
+                await self.registry.dispatch(event, chat_event(event, data), *resolved)
+            return
+
+        # handle 'reply' packets from server
+        if packet["type"] == "reply":
+
+            # see if there's a reply callback for this packet
+            callback = self.callbacks.pop(packet["id"], None)
+            if callback is not None:
 
-    async def send_message(self, message, user = None):
+                # invoke callback with data from reply packet
+                response = packet.get("data", packet)
+                await callback(response)
+
+    async def send_message(self, message, user = None, wait = False):
         """Send a message in the chat.
 
         Args:
             message (str): Message to send.
             user (str): Username to whisper to. Optional, will be sent in all chat if not provided.
+            wait (bool): Wait until the message was sent, instead of only queued behind the rate limit.
+        """
+        args = ("msg", message) if user is None else ("whisper", user, message)
+        if wait and self.outbound is not None:
+            await self.queue_method_packet(*args)
+        else:
+            await self.send_method_packet(*args)
+
+    async def moderate(self, message, action, duration = "60s"):
+        """Deletes a message, or times its author out. Used by the flood detector and the message filter.
+
+        Args:
+            message (MixerChatMessage): The message to moderate.
+            action (str): 'delete' or 'timeout', anything else does nothing.
+            duration (str): Duration of timeouts (ex: '60s', '5m').
+
+        Returns:
+            bool: True if the message was moderated and shouldn't be handled any further.
         """
-        if user is None:
-            await self.send_method_packet("msg", message)
+        if action == "delete":
+            await self.send_method_packet("deleteMessage", message.id)
+        elif action == "timeout":
+            await self.send_method_packet("timeout", message.username, duration)
         else:
-            await self.send_method_packet("whisper", user, message)
+            return False
+        return True
+
+    async def whisper_many(self, users, messages, progress = None):
+        """Whispers one or more messages to many users at once.
+
+        Messages longer than MESSAGE_LIMIT are split into several whispers. Whispers go through the
+        rate limited outbound queues (spread across send connections, see add_connection), and each
+        user receives their whispers in order.
+
+        Args:
+            users (list): Usernames to whisper to.
+            messages (str): Message, or list of messages, to whisper to every user.
+            progress (function): Called with (completed, total) after each user, may be a coroutine function. Optional.
+
+        Returns:
+            dict: Username -> None if every whisper was sent, or the exception that stopped sending to them.
+        """
+        if isinstance(messages, str):
+            messages = [messages]
+        chunks = [chunk for message in messages for chunk in split_message(message, self.MESSAGE_LIMIT)]
+
+        users = list(dict.fromkeys(users)) # drop duplicates, keeping order
+        results = dict()
+
+        async def whisper(user):
+            try:
+                for chunk in chunks:
+                    await self.queue_method_packet("whisper", user, chunk)
+                results[user] = None
+            except Exception as e:
+                results[user] = e
+
+            if progress is not None:
+                update = progress(len(results), len(users))
+                if inspect.isawaitable(update):
+                    await update
+
+        await asyncio.gather(*(whisper(user) for user in users))
+        return { user: results[user] for user in users }
+
+    def announce(self, message, interval, min_messages = 0, delay = None, scheduler = None):
+        """Sends a message to the chat periodically.
+
+        Args:
+            message (str): Text to send, or a (coroutine) function returning it.
+            interval (float): Seconds between announcements.
+            min_messages (int): Skip the announcement unless this many chat messages were received since the last one.
+            delay (float): Seconds until the first announcement, defaults to 'interval'.
+            scheduler (MixerScheduler): Defaults to the scheduler shared by every chat.
+
+        Returns:
+            :class:`mixer.scheduler.MixerAnnouncement`: The scheduled announcement, which can be cancelled.
+        """
+        scheduler = scheduler if scheduler is not None else default_scheduler
+        return scheduler.add(self, message, interval, min_messages, delay)
 
     def command(self, **kwargs):
         return lambda f: self.commands.add(f.__name__, f, **kwargs)
 
+def split_message(text, limit):
+    """Splits text into chunks of at most 'limit' characters, preferably at whitespace.
+
+    Returns:
+        list: The chunks, in order.
+    """
+    chunks = list()
+    while len(text) > limit:
+        split = text.rfind(" ", 0, limit + 1)
+        if split <= 0:
+            split = limit # a single word longer than the limit
+        chunks.append(text[:split].rstrip())
+        text = text[split:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
 async def help_0(message):
     """Displays a list of commands that can be used in the chat."""
 
@@ -419,9 +876,7 @@ async def help_0(message):
     message2 = message2.format(chat.commands.prefix)
 
     # whisper formatted response messages to used
-    await chat.send_message(message1, message.username)
-    await asyncio.sleep(.5) # wait before sending second message :p
-    await chat.send_message(message2, message.username)
+    await chat.whisper_many([message.username], [message1, message2])
 
 async def help_1(message, name):
     """Provides a description of a specific command."""
@@ -0,0 +1,268 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+from .batching import MixerBatchWriter
+
+# index record: message id digest, user id, offset in segment, length of line
+INDEX_RECORD = struct.Struct("<16sqQI")
+
+def message_key(message_id):
+    """bytes: Fixed size key used to index a message id."""
+    return hashlib.blake2b(str(message_id).encode(), digest_size = 16).digest()
+
+class _IndexView:
+    """Read-only sequence over the keys of a memory-mapped index file, used to bisect it."""
+
+    def __init__(self, buffer, key):
+        self.buffer = buffer
+        self.key = key
+        self.count = len(buffer) // INDEX_RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.key(self.record(i))
+
+    def record(self, i):
+        return INDEX_RECORD.unpack_from(self.buffer, i * INDEX_RECORD.size)
+
+class _Segment:
+    """A sealed segment: its log file plus memory-mapped indexes by message id and user id."""
+
+    def __init__(self, path):
+        self.path = path
+        self._maps = list()
+        self.ids = _IndexView(self._map(path + ".idx"), lambda r: r[0])
+        self.users = _IndexView(self._map(path + ".uidx"), lambda r: (r[1], r[2]))
+
+    def _map(self, path):
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+            buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        self._maps.append(buffer)
+        return buffer
+
+    def find(self, key):
+        i = bisect.bisect_left(self.ids, key)
+        if i < len(self.ids):
+            record = self.ids.record(i)
+            if record[0] == key:
+                return record
+        return None
+
+    def user_records(self, user_id):
+        i = bisect.bisect_left(self.users, (user_id, 0))
+        records = list()
+        while i < len(self.users):
+            record = self.users.record(i)
+            if record[1] != user_id:
+                break
+            records.append(record)
+            i += 1
+        return records
+
+    def close(self):
+        for buffer in self._maps:
+            buffer.close()
+
+class MixerChatLog:
+    """Archives chat messages to rotating JSONL segments, written in batches off the event loop.
+
+    Each sealed segment gets two memory-mapped indexes (by message id and by user id), so
+    lookups and per-user history scans don't need to read whole segments.
+
+    Assign an instance to :attr:`mixer.chat.MixerChat.chat_log` to archive every chat message.
+    """
+
+    def __init__(self, directory, segment_size = 64 * 1024 * 1024, max_segments = None, batch_size = 500, flush_interval = 1.0):
+        """
+        Args:
+            directory (str): Directory to store segments in (created if it doesn't exist).
+            segment_size (int): Segments are sealed and rotated once they exceed this many bytes.
+            max_segments (int): Oldest segments are deleted beyond this amount. Optional.
+            batch_size (int): Pending messages which trigger an immediate flush.
+            flush_interval (float): Maximum seconds a message waits before being written.
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        # segments are only written, read and deleted on the writer's thread, so they need no locking
+        self._writer = MixerBatchWriter(self._write_batch, batch_size, flush_interval)
+
+        os.makedirs(directory, exist_ok = True)
+
+        # seal any segments left over from a previous run, then start a new one
+        self._segments = list()
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".jsonl"))
+        for name in names:
+            path = os.path.join(directory, name)
+            if not (os.path.exists(path + ".idx") and os.path.exists(path + ".uidx")):
+                self._write_indexes(path, self._scan(path))
+            self._segments.append(_Segment(path))
+        number = int(names[-1].split("-")[1].split(".")[0]) + 1 if names else 1
+        self._open_segment(number)
+
+    def append(self, message):
+        """Queues a chat message to be written. Doesn't block.
+
+        Args:
+            message: A :class:`mixer.objects.MixerChatMessage` or raw ChatMessage data.
+        """
+        data = message if isinstance(message, dict) else message.data
+        self._writer.pending.append((time.time(), data))
+        self._writer.added()
+
+    async def flush(self):
+        """Writes every pending message to disk."""
+        await self._writer.flush()
+
+    async def close(self):
+        """Flushes pending messages and seals the current segment."""
+        await self._writer.close(self._seal)
+        for segment in self._segments:
+            segment.close()
+
+    async def find(self, message_id):
+        """Looks up a written message by id.
+
+        Args:
+            message_id (str): The unique identifier of the message.
+
+        Returns:
+            dict: Entry containing 'time' and 'message' (raw ChatMessage data), or None if not found.
+        """
+        return await self._writer.run(self._find, message_key(message_id))
+
+    def _find(self, key):
+        """Runs on the writer thread, like writes and retention, so a segment can't be closed mid-lookup."""
+        active = self._active_ids.get(key)
+        if active is not None:
+            return self._read(self._active_path, active[1], active[2])
+
+        for segment in reversed(self._segments):
+            record = segment.find(key)
+            if record is not None:
+                return self._read(segment.path, record[2], record[3])
+        return None
+
+    async def history(self, user_id, limit = None):
+        """Gets messages written by a user, newest first.
+
+        Args:
+            user_id (int): The id of the user.
+            limit (int): Maximum amount of messages to return. Optional.
+
+        Returns:
+            list: Entries containing 'time' and 'message' (raw ChatMessage data).
+        """
+        return await self._writer.run(self._history, user_id, limit)
+
+    def _history(self, user_id, limit):
+        """Runs on the writer thread, see _find."""
+        entries = list()
+        for offset, length in reversed(self._active_users.get(user_id, [])):
+            if limit is not None and len(entries) >= limit:
+                return entries
+            entries.append(self._read(self._active_path, offset, length))
+
+        for segment in reversed(self._segments):
+            for record in reversed(segment.user_records(user_id)):
+                if limit is not None and len(entries) >= limit:
+                    return entries
+                entries.append(self._read(segment.path, record[2], record[3]))
+        return entries
+
+    def _read(self, path, offset, length):
+        with open(path, "rb") as file:
+            file.seek(offset)
+            return json.loads(file.read(length))
+
+    def _open_segment(self, number):
+        self._number = number
+        self._active_path = os.path.join(self.directory, "chat-{:06d}.jsonl".format(number))
+        self._active_file = open(self._active_path, "ab")
+        self._active_ids = dict() # key -> (user id, offset, length)
+        self._active_users = dict() # user id -> [(offset, length)]
+
+    def _write_batch(self, batch):
+        """Runs on the writer thread."""
+
+        offset = self._active_file.tell()
+        lines = list()
+        locations = list()
+        for timestamp, data in batch:
+            line = json.dumps({ "time": timestamp, "message": data }, separators = (",", ":")).encode() + b"\n"
+            lines.append(line)
+            locations.append((message_key(data.get("id")), data.get("user_id") or 0, offset, len(line)))
+            offset += len(line)
+
+        self._active_file.write(b"".join(lines))
+        self._active_file.flush()
+
+        for key, user_id, line_offset, length in locations:
+            self._active_ids[key] = (user_id, line_offset, length)
+            self._active_users.setdefault(user_id, list()).append((line_offset, length))
+
+        if offset >= self.segment_size:
+            self._seal()
+            self._open_segment(self._number + 1)
+            self._enforce_retention()
+
+    def _seal(self):
+        """Runs on the writer thread, writes indexes for the active segment."""
+
+        self._active_file.close()
+        if os.path.getsize(self._active_path) == 0:
+            os.remove(self._active_path)
+            return
+
+        records = [(key, user_id, offset, length) for key, (user_id, offset, length) in self._active_ids.items()]
+        self._write_indexes(self._active_path, records)
+        segment = _Segment(self._active_path)
+        self._segments.append(segment)
+        self._active_ids = dict()
+        self._active_users = dict()
+
+    def _enforce_retention(self):
+        if self.max_segments is None:
+            return
+        expired = self._segments[:-self.max_segments] if len(self._segments) > self.max_segments else []
+        self._segments = self._segments[len(expired):]
+
+        # readers run on this thread too, so no lookup is using the segment's indexes
+        for segment in expired:
+            segment.close()
+            for suffix in ("", ".idx", ".uidx"):
+                os.remove(segment.path + suffix)
+
+    def _scan(self, path):
+        """Builds index records for a segment which has no indexes."""
+        records = list()
+        offset = 0
+        with open(path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break # partially written line
+                data = json.loads(line)["message"]
+                records.append((message_key(data.get("id")), data.get("user_id") or 0, offset, len(line)))
+                offset += len(line)
+        return records
+
+    def _write_indexes(self, path, records):
+        # written to temporary files and renamed into place, so a crash never leaves a partial index
+        records.sort(key = lambda r: r[0])
+        self._write_index(path + ".idx", records)
+        records.sort(key = lambda r: (r[1], r[2]))
+        self._write_index(path + ".uidx", records)
+
+    def _write_index(self, path, records):
+        with open(path + ".tmp", "wb") as file:
+            file.write(b"".join(INDEX_RECORD.pack(*r) for r in records))
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+
+from .ws import MixerWS
+from .outbound import MixerOutboundQueue
+
+logger = logging.getLogger(__name__)
+
+class MixerChatConnection:
+    """An additional, send-only chat connection used by :class:`mixer.chat.MixerChat` to spread outbound load.
+
+    Each connection authenticates on its own (with its own OAuth identity, or the chat's) and has its own
+    rate limited outbound queue. Only replies are handled from its socket; events are read and discarded,
+    since the chat's primary connection already receives them.
+    """
+
+    def __init__(self, chat, oauth, rate = 5, burst = 10):
+        self.chat = chat
+        self.oauth = oauth
+        self.websocket = None
+        self.outbound = MixerOutboundQueue(self._send_packet, rate, burst)
+        self.authenticated = False
+        self._reader = None
+
+    async def _send_packet(self, packet):
+        await self.websocket.send_packet(packet)
+
+    async def connect(self, endpoint, authkey, timeout = 10):
+        """Connects to a chat server endpoint and authenticates.
+
+        Args:
+            endpoint (str): Chat server websocket url.
+            authkey (str): Authentication key for the connection's OAuth identity.
+            timeout (float): Seconds to wait for the server to reply to the auth packet.
+
+        Returns:
+            bool: Indicates if the server accepted the authentication.
+        """
+        self.websocket = MixerWS(endpoint, recorder = self.chat.recorder, **self.chat.ws_options)
+        await self.websocket.connect()
+
+        # auth is sent directly, there's nothing queued before it
+        packet = {
+            "type": "method",
+            "method": "auth",
+            "arguments": [self.chat.channel.id, self.oauth.user_id, authkey],
+            "id": self.chat.packet_id
+        }
+        self.chat.packet_id += 1
+
+        replied = asyncio.get_event_loop().create_future()
+        async def auth_callback(data):
+            if not replied.done():
+                replied.set_result(data.get("authenticated", False))
+        self.chat.register_method_callback(packet["id"], auth_callback)
+
+        self._reader = asyncio.ensure_future(self._read_packets())
+        await self.websocket.send_packet(packet)
+        try:
+            self.authenticated = await asyncio.wait_for(replied, timeout)
+        except asyncio.TimeoutError:
+            self.chat.callbacks.pop(packet["id"], None) # the server never replied, so it won't be called
+            self.authenticated = False
+        return self.authenticated
+
+    async def _read_packets(self):
+        """Handles replies to packets sent on this connection, until it's closed."""
+        try:
+            while True:
+                packet = await self.websocket.receive_packet()
+                if packet.get("type") == "reply":
+                    await self.chat.handle_packet(packet)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Chat send connection for channel %s closed: %r", self.chat.channel.id, e)
+        finally:
+            self.authenticated = False
+
+    @property
+    def load(self):
+        """float: Estimated seconds before a packet queued now would be sent."""
+        return self.outbound.backlog
+
+    async def close(self, timeout = None):
+        """Sends whatever is still queued (up to 'timeout' seconds) and closes the connection."""
+        self.authenticated = False
+        await self.outbound.drain(timeout)
+        self.outbound.close()
+        if self._reader is not None:
+            self._reader.cancel()
+        if self.websocket is not None:
+            await self.websocket.close()
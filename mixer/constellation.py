@@ -1,4 +1,5 @@
 from .ws import MixerWS
+from .events import constellation_event
 
 class MixerConstellation:
 
@@ -10,28 +11,51 @@ class MixerConstellation:
         self.callbacks = dict()
         self.packet_id = 0
 
+        # optional MixerPacketRecorder, captures traffic on the websocket
+        self.recorder = None
+
+        # MixerWS options (ex: compression, max_size, max_queue)
+        self.ws_options = dict()
+
     async def start(self):
         """Initializes the Constellation websocket and begins to listen for events."""
 
-        self.websocket = MixerWS(self.CONSTELLATION_URL)
+        self.websocket = MixerWS(self.CONSTELLATION_URL, recorder = self.recorder, **self.ws_options)
         await self.websocket.connect()
         await self.on_connected(self) # call on_connected func (we should probably subscribe to events)
 
         while True:
 
             # receive a packet from server
-            packet = await self.websocket.receive_packet()
+            try:
+                packet = await self.websocket.receive_packet()
+            except Exception:
+                if self.websocket.closing:
+                    return # closed by close()
+                raise
+            await self.handle_packet(packet)
+
+    async def close(self):
+        """Closes the Constellation websocket, which ends the loop in start."""
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def handle_packet(self, packet):
+        """Handles a single packet received from the Constellation server.
+
+        Args:
+            packet (dict): Decoded packet from the Constellation websocket.
+        """
 
-            # make sure it's an event we're subscribed to
-            if packet["type"] != "event": continue
-            if packet["event"] != "live": continue
+        # make sure it's an event we're subscribed to
+        if packet["type"] != "event": return
+        if packet["event"] != "live": return
 
-            # find and invoke the callback function with the packet & payload
-            event_name = packet["data"]["channel"]
-            payload = packet["data"]["payload"]
-            callback = self.callbacks.get(event_name, None)
-            if callback is not None:
-                await callback(packet, payload)
+        # find and invoke the callback function with the packet & payload (decoded into its event class)
+        event_name = packet["data"]["channel"]
+        callback = self.callbacks.get(event_name, None)
+        if callback is not None:
+            await callback(packet, constellation_event(event_name, packet["data"]["payload"]))
 
     async def subscribe(self, events, callback):
         """Subcribes the Constellation websocket to a list of provided events.
@@ -66,3 +90,36 @@ class MixerConstellation:
         # increment packet id and return unique packet id
         self.packet_id += 1
         return self.packet_id
+
+    async def unsubscribe(self, events):
+        """Unsubcribes the Constellation websocket from a list of provided events.
+
+        Args:
+            events (list): A list of events to unsubscribe from.
+
+        Returns:
+            int: The unique id used to identify the "liveunsubscribe" method packet.
+        """
+
+        # if a single event is provided, wrap it in a list automatically
+        if isinstance(events, str):
+            events = [events]
+
+        # build liveunsubscribe packet
+        packet = {
+            "type": "method",
+            "method": "liveunsubscribe",
+            "params": {
+                "events": events
+            },
+            "id": self.packet_id
+        }
+
+        # send packet to server and forget callbacks
+        await self.websocket.send_packet(packet)
+        for event in events:
+            self.callbacks.pop(event, None)
+
+        # increment packet id and return unique packet id
+        self.packet_id += 1
+        return self.packet_id
@@ -0,0 +1,135 @@
+import time
+
+class TimerWheel:
+    """Hashed timer wheel which expires keys after a duration, in O(1) amortized time per operation.
+
+    Keys are placed in the slot their expiry falls into. The wheel advances lazily whenever it's
+    used, clearing the slots it passes, so memory is proportional to the amount of unexpired keys.
+    Durations longer than a full rotation are supported; such keys are skipped until their round comes.
+    """
+
+    __slots__ = ("resolution", "slots", "expiries", "tick")
+
+    def __init__(self, resolution = 0.5, slot_count = 512, now = None):
+        """
+        Args:
+            resolution (float): Seconds per slot, expiries are rounded up to this.
+            slot_count (int): Amount of slots in the wheel.
+        """
+        self.resolution = resolution
+        self.slots = [set() for _ in range(slot_count)]
+        self.expiries = dict()
+        self.tick = int((now if now is not None else time.monotonic()) / resolution)
+
+    def add(self, key, duration, now):
+        """Expires a key after 'duration' seconds, replacing its previous expiry."""
+        self.advance(now)
+        expiry = now + duration
+        self.expiries[key] = expiry
+
+        # the key may be in another slot already, it's ignored there since its expiry no longer matches
+        tick = max(int(expiry / self.resolution) + 1, self.tick + 1)
+        self.slots[tick % len(self.slots)].add(key)
+
+    def remaining(self, key, now):
+        """float: Seconds until a key expires, 0 if it isn't in the wheel."""
+        self.advance(now)
+        expiry = self.expiries.get(key)
+        if expiry is None or expiry <= now:
+            return 0
+        return expiry - now
+
+    def advance(self, now):
+        """Expires every key in the slots passed since the last call."""
+        target = int(now / self.resolution)
+        if target <= self.tick:
+            return
+
+        # after a full rotation every slot has been visited, visiting them again is pointless
+        slot_count = len(self.slots)
+        first = max(self.tick + 1, target - slot_count + 1)
+        expiries = self.expiries
+        for tick in range(first, target + 1):
+            slot = self.slots[tick % slot_count]
+            if not slot:
+                continue
+            kept = set()
+            for key in slot:
+                expiry = expiries.get(key)
+                if expiry is None:
+                    continue
+                if expiry <= now:
+                    del expiries[key]
+                elif (int(expiry / self.resolution) + 1) % slot_count == tick % slot_count:
+                    # expires in a later rotation of the wheel (keys re-added to another slot are dropped here)
+                    kept.add(key)
+            slot.clear()
+            slot.update(kept)
+        self.tick = target
+
+    def __len__(self):
+        return len(self.expiries)
+
+class MixerCooldowns:
+    """Tracks global, per-user and per-role command cooldowns in a timer wheel.
+
+    Cooldowns are declared when a command is added (see :meth:`mixer.chat.MixerChat.command`):
+
+        @chat.command(cooldown = 5, user_cooldown = 30, role_cooldowns = {"Subscriber": 10, "Mod": 0})
+        async def dice(message):
+            ...
+
+    'cooldown' applies to everyone, 'user_cooldown' to each user separately. 'role_cooldowns' replaces
+    the user cooldown for users with one of the roles (the shortest applies), and roles mapped to 0
+    bypass every cooldown of the command.
+    """
+
+    def __init__(self, resolution = 0.5, slot_count = 512):
+        self.wheel = TimerWheel(resolution, slot_count)
+
+    @staticmethod
+    def user_duration(command, message):
+        """float: The per-user cooldown for the message's author, or None if they bypass cooldowns."""
+        duration = command["user_cooldown"]
+        role_cooldowns = command["role_cooldowns"]
+        if role_cooldowns:
+            durations = [role_cooldowns[role] for role in message.roles or () if role in role_cooldowns]
+            if durations:
+                duration = min(durations)
+                if not duration:
+                    return None
+        return duration or 0
+
+    def check(self, command, message, now = None):
+        """Gets the time left before a user can use a command again.
+
+        Args:
+            command (dict): Command, as stored by :class:`mixer.chat.MixerChat.ChatCommands`.
+            message (MixerChatMessage): Message invoking the command.
+
+        Returns:
+            float: Seconds left on the longest applicable cooldown, 0 if the command can be used.
+        """
+        if not command["cooldown"] and not command["user_cooldown"] and not command["role_cooldowns"]:
+            return 0
+        if self.user_duration(command, message) is None:
+            return 0
+
+        now = now if now is not None else time.monotonic()
+        name = command["name"]
+        return max(self.wheel.remaining(name, now), self.wheel.remaining((name, message.user_id), now))
+
+    def start(self, command, message, now = None):
+        """Starts a command's cooldowns after it was used."""
+        user_duration = self.user_duration(command, message)
+        if user_duration is None:
+            return
+
+        now = now if now is not None else time.monotonic()
+        if command["cooldown"]:
+            self.wheel.add(command["name"], command["cooldown"], now)
+        if user_duration:
+            self.wheel.add((command["name"], message.user_id), user_duration, now)
+
+    def __len__(self):
+        return len(self.wheel)
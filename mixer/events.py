@@ -0,0 +1,412 @@
+from .registry import data_subject
+
+class MixerEvent(dict):
+    """Base class for chat and Constellation events, a dict of the raw event data.
+
+    Creating an event makes a shallow copy of the packet's top level keys (nested values are
+    shared), so events are only created when a handler is registered for them. Typed fields are
+    decoded from the data when they're accessed. Since events are dicts, handlers written for the
+    raw data (ex: event["id"], json.dumps(event)) keep working.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data = None):
+        super().__init__(data if data is not None else ())
+
+    @property
+    def data(self):
+        """dict: The raw event data (the event itself)."""
+        return self
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict.__repr__(self))
+
+    @property
+    def user_id(self):
+        """int: Id of the user the event refers to, if any."""
+        return data_subject(self)[0]
+
+    @property
+    def username(self):
+        """str: Name of the user the event refers to, if any."""
+        return data_subject(self)[1]
+
+    @property
+    def roles(self):
+        """list: Roles of the user the event refers to."""
+        return data_subject(self)[2]
+
+class MixerEventUser:
+    """A user nested in an event (ex: a moderator), in the chat's user_* format."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data if data is not None else dict()
+
+    @property
+    def user_id(self):
+        """int: The user's id."""
+        return self.data.get("user_id")
+
+    @property
+    def username(self):
+        """str: The user's name."""
+        return self.data.get("user_name")
+
+    @property
+    def roles(self):
+        """list: The user's chat roles."""
+        return self.data.get("user_roles") or []
+
+    @property
+    def level(self):
+        """int: The user's level."""
+        return self.data.get("user_level")
+
+    def __repr__(self):
+        return "MixerEventUser({!r})".format(self.username)
+
+def _user(data, key):
+    value = data.get(key)
+    return MixerEventUser(value) if isinstance(value, dict) else None
+
+class ModerationEvent(MixerEvent):
+    """An event caused by a moderator, who is the user the event refers to (ex: for registry filters)."""
+    __slots__ = ()
+
+    MODERATOR_KEY = "moderator"
+
+    @property
+    def moderator(self):
+        """:class:`MixerEventUser`: The user who moderated."""
+        return _user(self.data, self.MODERATOR_KEY)
+
+    @property
+    def user_id(self):
+        moderator = self.moderator
+        return moderator.user_id if moderator is not None else None
+
+    @property
+    def username(self):
+        moderator = self.moderator
+        return moderator.username if moderator is not None else None
+
+    @property
+    def roles(self):
+        moderator = self.moderator
+        return moderator.roles if moderator is not None else []
+
+# https://dev.mixer.com/reference/chat/events
+
+class WelcomeEvent(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def server(self):
+        """str: Id of the chat server the connection was made to."""
+        return self.data.get("server")
+
+class UserJoin(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def user_id(self):
+        """int: Id of the user who joined."""
+        return self.data.get("id")
+
+    @property
+    def username(self):
+        """str: Name of the user who joined."""
+        return self.data.get("username")
+
+    @property
+    def roles(self):
+        """list: Chat roles of the user."""
+        return self.data.get("roles") or []
+
+    @property
+    def channel_id(self):
+        """int: Channel the event originated from."""
+        return self.data.get("originatingChannel")
+
+class UserLeave(UserJoin):
+    __slots__ = ()
+
+class PollStart(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def question(self):
+        """str: The poll's question."""
+        return self.data.get("q")
+
+    @property
+    def answers(self):
+        """list: The possible answers."""
+        return self.data.get("answers") or []
+
+    @property
+    def author(self):
+        """:class:`MixerEventUser`: The user who started the poll."""
+        return _user(self.data, "author")
+
+    @property
+    def user_id(self):
+        author = self.data.get("author") or dict()
+        return author.get("user_id")
+
+    @property
+    def username(self):
+        author = self.data.get("author") or dict()
+        return author.get("user_name")
+
+    @property
+    def roles(self):
+        author = self.data.get("author") or dict()
+        return author.get("user_roles") or []
+
+    @property
+    def duration(self):
+        """int: Length of the poll, in milliseconds."""
+        return self.data.get("duration")
+
+    @property
+    def ends_at(self):
+        """int: Unix time (in milliseconds) the poll ends at."""
+        return self.data.get("endsAt")
+
+    @property
+    def voters(self):
+        """int: Amount of users who voted."""
+        return self.data.get("voters", 0)
+
+    @property
+    def responses(self):
+        """dict: Answer -> amount of votes."""
+        return self.data.get("responses") or dict()
+
+class PollEnd(PollStart):
+    __slots__ = ()
+
+    @property
+    def winner(self):
+        """str: The answer with the most votes, None if nobody voted."""
+        responses = self.responses
+        return max(responses, key = responses.get) if responses else None
+
+class DeleteMessage(ModerationEvent):
+    __slots__ = ()
+
+    @property
+    def message_id(self):
+        """str: Id of the deleted message."""
+        return self.data.get("id")
+
+class PurgeMessage(ModerationEvent):
+    __slots__ = ()
+
+    @property
+    def purged_user_id(self):
+        """int: Id of the user whose messages were purged."""
+        return self.data.get("user_id")
+
+class ClearMessages(ModerationEvent):
+    __slots__ = ()
+
+    MODERATOR_KEY = "clearer"
+
+    @property
+    def clearer(self):
+        """:class:`MixerEventUser`: The user who cleared the chat."""
+        return self.moderator
+
+class UserUpdate(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def user_id(self):
+        """int: Id of the updated user."""
+        return self.data.get("user")
+
+    @property
+    def username(self):
+        """str: Name of the updated user."""
+        return self.data.get("username")
+
+    @property
+    def roles(self):
+        """list: The user's new chat roles."""
+        return self.data.get("roles") or []
+
+    @property
+    def permissions(self):
+        """list: The user's new chat permissions."""
+        return self.data.get("permissions") or []
+
+class UserTimeout(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def user(self):
+        """:class:`MixerEventUser`: The user who was timed out."""
+        return _user(self.data, "user")
+
+    @property
+    def duration(self):
+        """int: Length of the timeout, in milliseconds."""
+        return self.data.get("duration")
+
+class SkillAttribution(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def skill(self):
+        """dict: The skill used (skill_id, skill_name, execution_id, icon_url, cost, currency)."""
+        return self.data.get("skill") or dict()
+
+    @property
+    def skill_name(self):
+        """str: Name of the skill."""
+        return self.skill.get("skill_name")
+
+    @property
+    def execution_id(self):
+        """str: Unique id of this use of the skill, referenced by DeleteSkillAttribution."""
+        return self.skill.get("execution_id")
+
+    @property
+    def cost(self):
+        """int: Amount of currency the skill cost."""
+        return self.skill.get("cost", 0)
+
+    @property
+    def currency(self):
+        """str: 'Sparks' or 'Embers'."""
+        return self.skill.get("currency")
+
+class DeleteSkillAttribution(MixerEvent):
+    __slots__ = ()
+
+    @property
+    def execution_id(self):
+        """str: Execution id of the cancelled skill."""
+        return self.data.get("execution_id")
+
+CHAT_EVENTS = { cls.__name__: cls for cls in (
+    WelcomeEvent, UserJoin, UserLeave, PollStart, PollEnd, DeleteMessage, PurgeMessage,
+    ClearMessages, UserUpdate, UserTimeout, SkillAttribution, DeleteSkillAttribution
+)}
+
+def chat_event(name, data):
+    """:class:`MixerEvent`: Wraps the data of a chat event in its event class."""
+    return CHAT_EVENTS.get(name, MixerEvent)(data)
+
+# https://dev.mixer.com/reference/constellation/events/live
+
+class ChannelUpdate(MixerEvent):
+    """channel:{id}:update, a partial channel (only the changed fields are included)."""
+    __slots__ = ()
+
+    @property
+    def online(self):
+        return self.data.get("online")
+
+    @property
+    def viewers(self):
+        return self.data.get("viewersCurrent")
+
+    @property
+    def followers(self):
+        return self.data.get("numFollowers")
+
+class BroadcastUpdate(MixerEvent):
+    """channel:{id}:broadcast"""
+    __slots__ = ()
+
+    @property
+    def online(self):
+        return self.data.get("online")
+
+    @property
+    def started_at(self):
+        """str: ISO 8601 time the broadcast started, if included."""
+        return self.data.get("startedAt")
+
+class ChannelFollowed(MixerEvent):
+    """channel:{id}:followed"""
+    __slots__ = ()
+
+    @property
+    def following(self):
+        """bool: True for a follow, False for an unfollow."""
+        return self.data.get("following")
+
+    @property
+    def user(self):
+        """dict: The user who (un)followed."""
+        return self.data.get("user") or dict()
+
+    @property
+    def user_id(self):
+        return self.user.get("id")
+
+    @property
+    def username(self):
+        return self.user.get("username")
+
+class ChannelHosted(MixerEvent):
+    """channel:{id}:hosted"""
+    __slots__ = ()
+
+    @property
+    def hoster_id(self):
+        return self.data.get("hosterId")
+
+    @property
+    def hoster(self):
+        """dict: The hosting channel."""
+        return self.data.get("hoster") or dict()
+
+class ChannelSubscribed(MixerEvent):
+    """channel:{id}:subscribed and channel:{id}:resubscribed"""
+    __slots__ = ()
+
+    @property
+    def user(self):
+        """dict: The subscribing user."""
+        return self.data.get("user") or dict()
+
+    @property
+    def user_id(self):
+        return self.user.get("id")
+
+    @property
+    def username(self):
+        return self.user.get("username")
+
+    @property
+    def total_months(self):
+        """int: Months subscribed in total (resubscriptions only)."""
+        return self.data.get("totalMonths")
+
+class UserUpdated(MixerEvent):
+    """user:{id}:update, a partial user."""
+    __slots__ = ()
+
+CONSTELLATION_EVENTS = {
+    ("channel", "update"): ChannelUpdate,
+    ("channel", "broadcast"): BroadcastUpdate,
+    ("channel", "followed"): ChannelFollowed,
+    ("channel", "hosted"): ChannelHosted,
+    ("channel", "subscribed"): ChannelSubscribed,
+    ("channel", "resubscribed"): ChannelSubscribed,
+    ("user", "update"): UserUpdated
+}
+
+def constellation_event(name, payload):
+    """:class:`MixerEvent`: Wraps a Constellation payload (ex: for 'channel:1:update') in its event class."""
+    parts = name.split(":")
+    cls = CONSTELLATION_EVENTS.get((parts[0], parts[-1]), MixerEvent) if len(parts) == 3 else MixerEvent
+    return cls(payload)
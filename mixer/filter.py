@@ -0,0 +1,179 @@
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton which finds every occurrence of a set of phrases in one pass over a text.
+
+    Matching is case-insensitive. Building is O(total phrase length), scanning is O(text length + matches).
+    """
+
+    def __init__(self, phrases):
+        self.phrases = sorted(set(p.lower() for p in phrases if p))
+
+        # trie transitions, failure links and matched phrase indexes, per node
+        self._goto = [dict()]
+        self._fail = [0]
+        self._output = [()]
+
+        for index, phrase in enumerate(self.phrases):
+            node = 0
+            for char in phrase:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append(dict())
+                    self._fail.append(0)
+                    self._output.append(())
+                node = child
+            self._output[node] += (index,)
+
+        # breadth first, so failure links of shallower nodes are known first
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def scan(self, text):
+        """Finds every occurrence of every phrase.
+
+        Args:
+            text (str): The text to search.
+
+        Returns:
+            list: (start, end, phrase) tuples, ordered by end position.
+        """
+        goto, fail, output, phrases = self._goto, self._fail, self._output, self.phrases
+        matches = list()
+        node = 0
+
+        # NOTE: positions refer to the lowercased text, which has the same length for practically all chat text
+        for i, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                phrase = phrases[index]
+                matches.append((i + 1 - len(phrase), i + 1, phrase))
+
+        return matches
+
+class MixerChatFilter:
+    """Checks chat messages against banned phrases and domains.
+
+    Assign an instance to :attr:`mixer.chat.MixerChat.filter` to scan every message before
+    it's handled. The word lists are compiled once into a :class:`PhraseAutomaton`, and can
+    be replaced with :meth:`reload` while the chat is running.
+    """
+
+    def __init__(self, phrases = (), domains = (), action = "delete", whole_words = True, timeout_duration = "60s"):
+        """
+        Args:
+            phrases (list): Banned words/phrases.
+            domains (list): Banned domains, also matching their subdomains.
+            action (str): 'delete', 'timeout' or None (only dispatch the 'filter_matched' event).
+            whole_words (bool): Only match phrases which aren't part of a larger word.
+            timeout_duration (str): Duration of timeouts (ex: '60s', '5m').
+        """
+        self.action = action
+        self.whole_words = whole_words
+        self.timeout_duration = timeout_duration
+        self._compile(phrases, domains)
+
+    def _compile(self, phrases, domains):
+        self.automaton, self.domains = self.build(phrases, domains)
+
+    @staticmethod
+    def build(phrases, domains):
+        """tuple: Compiles word lists into an automaton and a set of domains."""
+        domains = set(d.lower().strip(".") for d in domains if d)
+        return PhraseAutomaton(list(phrases) + list(domains)), domains
+
+    async def reload(self, phrases, domains = ()):
+        """Replaces the word lists without stalling the event loop.
+
+        The automaton is built on a worker thread and swapped in once it's complete,
+        so messages keep being checked against the old lists until then.
+        """
+        loop = asyncio.get_event_loop()
+        self.automaton, self.domains = await loop.run_in_executor(None, self.build, phrases, domains)
+
+    def scan_text(self, text):
+        """list: Finds banned phrases/domains in a text, as (start, end, phrase) tuples."""
+        matches = self.automaton.scan(text)
+        if self.whole_words:
+            matches = [m for m in matches if self._is_whole_word(text, m[0], m[1])]
+        return matches
+
+    def scan(self, message):
+        """Finds banned phrases and linked domains in a chat message.
+
+        Args:
+            message (MixerChatMessage): The message to check.
+
+        Returns:
+            list: (start, end, phrase) tuples. Positions refer to message.text.
+        """
+        fragments = message.message_raw["message"]
+        text = "".join(fragment["text"] for fragment in fragments)
+        matches = self.scan_text(text)
+
+        # links may point to banned domains without naming them in the text
+        if self.domains:
+            offset = 0
+            for fragment in fragments:
+                if fragment.get("type") == "link":
+                    domain = self.match_domain(fragment.get("url", ""))
+                    if domain is not None:
+                        matches.append((offset, offset + len(fragment["text"]), domain))
+                offset += len(fragment["text"])
+
+        return matches
+
+    def match_domain(self, url):
+        """str: Gets the banned domain a url belongs to, or None."""
+        if "//" not in url:
+            url = "//" + url
+        host = (urlsplit(url).hostname or "").lower()
+
+        # check the host and each parent domain (ex: a.b.com, b.com, com)
+        labels = host.split(".")
+        for i in range(len(labels)):
+            domain = ".".join(labels[i:])
+            if domain in self.domains:
+                return domain
+        return None
+
+    @staticmethod
+    def censor(text, matches, char = "*"):
+        """str: Replaces the matched ranges of a text."""
+        chars = list(text)
+        for start, end, _ in matches:
+            for i in range(max(start, 0), min(end, len(chars))):
+                if not chars[i].isspace():
+                    chars[i] = char
+        return "".join(chars)
+
+    async def enforce(self, chat, message, matches):
+        """Applies the configured action to a message which matched.
+
+        Returns:
+            bool: True if the message was moderated and shouldn't be handled any further.
+        """
+        return await chat.moderate(message, self.action, self.timeout_duration)
+
+    @staticmethod
+    def _is_whole_word(text, start, end):
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not before.isalnum() and not after.isalnum()
@@ -0,0 +1,168 @@
+import re
+import time
+
+class SlidingWindowCounter:
+    """Approximate sliding window event counter using O(1) time and memory.
+
+    Counts for the current and previous fixed windows are kept, and the previous
+    window is weighted by how much of it still overlaps the sliding window.
+    """
+
+    __slots__ = ("window", "start", "current", "previous")
+
+    def __init__(self, window, now):
+        self.window = window
+        self.start = now
+        self.current = 0
+        self.previous = 0
+
+    def _advance(self, now):
+        elapsed = now - self.start
+        if elapsed >= self.window:
+            # if more than one whole window passed, the previous window is empty
+            self.previous = self.current if elapsed < self.window * 2 else 0
+            self.current = 0
+            self.start = now - (elapsed % self.window)
+
+    def add(self, now, amount = 1):
+        """int: Records an event and returns the estimated count within the window."""
+        self._advance(now)
+        self.current += amount
+        return self.count(now)
+
+    def count(self, now):
+        """int: Estimated amount of events within the window ending at 'now'."""
+        self._advance(now)
+        overlap = 1 - (now - self.start) / self.window
+        return int(self.previous * overlap) + self.current
+
+    def idle(self, now):
+        """bool: Indicates that no events fall within the window anymore."""
+        return now - self.start >= self.window * 2
+
+class MixerFloodDetector:
+    """Detects chat floods and spam using per-user/per-channel sliding windows and content fingerprints.
+
+    Assign an instance to :attr:`mixer.chat.MixerChat.flood` to check every message before it
+    reaches :meth:`mixer.chat.MixerChat.ChatCommands.handle`. Each check is O(1).
+
+    Reasons are 'user_rate' (a user sends too many messages), 'repeated_content' (a user
+    repeats the same message), 'copy_paste' (many users send the same message) and 'channel_rate'
+    (the whole channel exceeds a message rate). The action for each reason can be 'delete', 'timeout' or None.
+    """
+
+    EXEMPT_ROLES = {"Owner", "Mod", "ChannelEditor", "Staff", "Founder", "Guardian"}
+
+    def __init__(self, window = 10, user_limit = 8, repeat_limit = 3, copy_paste_limit = None, channel_limit = None, actions = None, timeout_duration = "60s", exempt_roles = None):
+        """
+        Args:
+            window (float): Length of the sliding windows, in seconds.
+            user_limit (int): Messages a single user may send within the window.
+            repeat_limit (int): Times a user may send the same content within the window.
+            copy_paste_limit (int): Times the same content may be sent by anyone within the window. Optional.
+            channel_limit (int): Messages the channel may receive within the window. Optional.
+            actions (dict): Reason -> action, overriding the defaults.
+            timeout_duration (str): Duration of timeouts (ex: '60s', '5m').
+            exempt_roles (set): Roles which are never checked.
+        """
+        self.window = window
+        self.user_limit = user_limit
+        self.repeat_limit = repeat_limit
+        self.copy_paste_limit = copy_paste_limit
+        self.channel_limit = channel_limit
+        self.timeout_duration = timeout_duration
+        self.exempt_roles = set(exempt_roles) if exempt_roles is not None else set(self.EXEMPT_ROLES)
+        self.actions = { "user_rate": "timeout", "repeated_content": "delete", "copy_paste": "delete", "channel_rate": None }
+        self.actions.update(actions or dict())
+
+        self._users = dict() # user id -> SlidingWindowCounter
+        self._repeats = dict() # (user id, content fingerprint) -> SlidingWindowCounter
+        self._copies = dict() # content fingerprint -> SlidingWindowCounter
+        self._channel = None
+        self._last_sweep = time.monotonic()
+
+        # amount of messages flagged, by reason
+        self.flagged = dict()
+
+    @staticmethod
+    def fingerprint(text):
+        """int: Hash of a message's content, ignoring case, whitespace and punctuation.
+
+        Messages without any letters or digits (ex: ':)', '???') are hashed as they are, so they
+        aren't all considered the same message.
+        """
+        text = text.lower()
+        return hash(re.sub(r"[\W_]+", "", text) or text)
+
+    def check(self, message, now = None):
+        """Records a message and determines if it's part of a flood.
+
+        Args:
+            message (MixerChatMessage): The message to check.
+            now (float): Current time (time.monotonic), mostly useful for testing.
+
+        Returns:
+            str: The reason the message was flagged, or None.
+        """
+
+        roles = message.roles or ()
+        if not self.exempt_roles.isdisjoint(roles):
+            return None
+
+        if now is None:
+            now = time.monotonic()
+        if now - self._last_sweep >= self.window:
+            self._sweep(now)
+
+        reason = None
+
+        if self.channel_limit is not None:
+            if self._channel is None:
+                self._channel = SlidingWindowCounter(self.window, now)
+            if self._channel.add(now) > self.channel_limit:
+                reason = "channel_rate"
+
+        counter = self._users.get(message.user_id)
+        if counter is None:
+            counter = self._users[message.user_id] = SlidingWindowCounter(self.window, now)
+        if counter.add(now) > self.user_limit:
+            reason = "user_rate"
+
+        fingerprint = self.fingerprint(message.text)
+        if self.copy_paste_limit is not None:
+            counter = self._copies.get(fingerprint)
+            if counter is None:
+                counter = self._copies[fingerprint] = SlidingWindowCounter(self.window, now)
+            if counter.add(now) > self.copy_paste_limit and reason is None:
+                reason = "copy_paste"
+
+        key = (message.user_id, fingerprint)
+        counter = self._repeats.get(key)
+        if counter is None:
+            counter = self._repeats[key] = SlidingWindowCounter(self.window, now)
+        if counter.add(now) > self.repeat_limit and reason is None:
+            reason = "repeated_content"
+
+        if reason is not None:
+            self.flagged[reason] = self.flagged.get(reason, 0) + 1
+        return reason
+
+    async def enforce(self, chat, message, reason):
+        """Applies the action configured for a reason.
+
+        Args:
+            chat (MixerChat): The chat the message was sent in.
+            message (MixerChatMessage): The flagged message.
+            reason (str): The reason returned by :meth:`check`.
+
+        Returns:
+            bool: True if the message was moderated and shouldn't be handled any further.
+        """
+        return await chat.moderate(message, self.actions.get(reason), self.timeout_duration)
+
+    def _sweep(self, now):
+        """Forgets counters which no longer hold any events, keeping memory bounded."""
+        for counters in (self._users, self._repeats, self._copies):
+            for key in [key for key, counter in counters.items() if counter.idle(now)]:
+                del counters[key]
+        self._last_sweep = now
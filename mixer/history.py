@@ -0,0 +1,104 @@
+class MixerMessageHistory:
+    """Fixed-size ring buffer of recent chat messages, indexed by message id and user id.
+
+    Once full, adding a message overwrites the oldest one, so memory stays bounded.
+    Deleting a message is O(1) and purging a user's messages is O(k) in the amount removed.
+    """
+
+    def __init__(self, capacity = 500):
+        """
+        Args:
+            capacity (int): Maximum amount of messages to keep.
+        """
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next = 0 # slot the next message will be written to
+        self._by_id = dict() # message id -> slot
+        self._by_user = dict() # user id -> { slot: None }, an insertion-ordered (oldest first) set
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        """Iterates messages from oldest to newest."""
+        for i in range(self.capacity):
+            message = self._slots[(self._next + i) % self.capacity]
+            if message is not None:
+                yield message
+
+    def add(self, message):
+        """Stores a message, evicting the oldest one if the buffer is full.
+
+        Args:
+            message (MixerChatMessage): The message to store.
+        """
+        if self.capacity <= 0:
+            return
+
+        slot = self._next
+        self._remove_slot(slot)
+        self._slots[slot] = message
+        self._by_id[message.id] = slot
+        self._by_user.setdefault(message.user_id, dict())[slot] = None
+        self._next = (slot + 1) % self.capacity
+
+    def get(self, message_id):
+        """:class:`mixer.objects.MixerChatMessage`: Gets a stored message by id, or None."""
+        slot = self._by_id.get(message_id)
+        return self._slots[slot] if slot is not None else None
+
+    def by_user(self, user_id):
+        """list: Gets the stored messages sent by a user, oldest first."""
+        return [self._slots[slot] for slot in self._by_user.get(user_id, ())]
+
+    def delete(self, message_id):
+        """Removes a message from the buffer.
+
+        Args:
+            message_id (str): The unique identifier of the message.
+
+        Returns:
+            MixerChatMessage: The removed message, or None if it isn't stored.
+        """
+        slot = self._by_id.get(message_id)
+        return self._remove_slot(slot) if slot is not None else None
+
+    def purge(self, user_id):
+        """Removes every message sent by a user.
+
+        Returns:
+            list: The removed messages, oldest first.
+        """
+        slots = self._by_user.get(user_id)
+        if not slots:
+            return []
+        return [self._remove_slot(slot) for slot in list(slots)]
+
+    def clear(self):
+        """Removes every message.
+
+        Returns:
+            list: The removed messages, oldest first.
+        """
+        removed = list(self)
+        self._slots = [None] * self.capacity
+        self._by_id.clear()
+        self._by_user.clear()
+        return removed
+
+    def _remove_slot(self, slot):
+        message = self._slots[slot]
+        if message is None:
+            return None
+
+        self._slots[slot] = None
+        if self._by_id.get(message.id) == slot:
+            del self._by_id[message.id]
+
+        slots = self._by_user.get(message.user_id)
+        if slots is not None:
+            slots.pop(slot, None)
+            if not slots:
+                del self._by_user[message.user_id]
+
+        return message
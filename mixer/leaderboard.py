@@ -0,0 +1,261 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+def window_start(window, now = None):
+    """Returns the unix timestamp a leaderboard window started at (UTC), or None if it never resets.
+
+    Args:
+        window (str): 'weekly' (starting monday), 'monthly', 'yearly', 'alltime' or 'session'.
+        now (float): Unix timestamp, defaults to the current time.
+    """
+    if window in ("alltime", "session"):
+        return None
+
+    date = datetime.fromtimestamp(now if now is not None else time.time(), timezone.utc)
+    date = date.replace(hour = 0, minute = 0, second = 0, microsecond = 0)
+    if window == "weekly":
+        return date.timestamp() - date.weekday() * 86400
+    if window == "monthly":
+        return date.replace(day = 1).timestamp()
+    if window == "yearly":
+        return date.replace(month = 1, day = 1).timestamp()
+    raise ValueError("Unknown leaderboard window: {}".format(window))
+
+class TopK:
+    """Per-user totals with a lazily maintained max-heap, for fast top-k queries under frequent updates.
+
+    Every change pushes a new heap entry rather than updating the old one in place. Entries whose
+    total no longer matches the user's current total are stale and dropped when they surface.
+    """
+
+    __slots__ = ("totals", "_heap")
+
+    def __init__(self):
+        self.totals = dict()
+        self._heap = list()
+
+    def add(self, user_id, amount):
+        total = self.totals.get(user_id, 0) + amount
+        if total > 0:
+            self.totals[user_id] = total
+            heapq.heappush(self._heap, (-total, user_id))
+        else:
+            self.totals.pop(user_id, None)
+
+        # rebuild once stale entries dominate, keeps memory proportional to the amount of users
+        if len(self._heap) > 2 * len(self.totals) + 64:
+            self._heap = [(-total, user_id) for user_id, total in self.totals.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, count):
+        """list: Up to 'count' (user_id, total) tuples, highest total first."""
+        found = list()
+        while self._heap and len(found) < count:
+            total, user_id = heapq.heappop(self._heap)
+            if self.totals.get(user_id) == -total:
+                found.append((user_id, -total))
+
+        # the valid entries are still needed for the next query
+        for user_id, total in found:
+            heapq.heappush(self._heap, (-total, user_id))
+        return found
+
+    def clear(self):
+        self.totals.clear()
+        self._heap.clear()
+
+    def __len__(self):
+        return len(self.totals)
+
+class MixerLeaderboard:
+    """Live sparks/embers leaderboards built from a chat's SkillAttribution events.
+
+    Totals are kept per currency and window, and reconciled against the v2 REST leaderboard
+    on a schedule (see run), since events can be missed while disconnected.
+
+    Example:
+        leaderboard = MixerLeaderboard(api, channel_id)
+        leaderboard.attach(chat)
+        asyncio.ensure_future(leaderboard.run())
+        leaderboard.top("sparks", "weekly", 10)
+    """
+
+    CURRENCIES = ("sparks", "embers")
+    WINDOWS = ("session", "weekly", "monthly", "yearly", "alltime")
+
+    def __init__(self, api = None, channel_id = None, currencies = CURRENCIES, windows = WINDOWS, reconcile_limit = 100, execution_history = 10000):
+        """
+        Args:
+            api (:class:`mixer.api.MixerAPI`): Used for reconciliation. Optional.
+            channel_id (int): Channel the leaderboards belong to, required for reconciliation.
+            currencies (tuple): Currencies to keep leaderboards for.
+            windows (tuple): Windows to keep leaderboards for. 'session' counts from creation and isn't reconciled.
+            reconcile_limit (int): Amount of users fetched per REST leaderboard when reconciling.
+            execution_history (int): Amount of recent skill executions remembered, so cancellations can be undone.
+        """
+        self.api = api
+        self.channel_id = channel_id
+        self.reconcile_limit = reconcile_limit
+        self.execution_history = execution_history
+
+        # (currency, window) -> TopK, and the start of each window's current period
+        self.boards = { (currency, window): TopK() for currency in currencies for window in windows }
+        self.periods = { window: window_start(window) for window in windows }
+
+        # execution id -> (user_id, currency, amount, timestamp)
+        self.executions = OrderedDict()
+        self.usernames = dict()
+
+        self.events = 0
+        self.cancelled = 0
+        self.last_reconcile = None
+
+    def attach(self, chat):
+        """Consumes SkillAttribution & DeleteSkillAttribution events from a MixerChat.
+
+        The handlers are added to the chat's registry, so the chat shouldn't share its registry with other channels.
+        """
+        chat.registry.add("SkillAttribution", self.handle_skill)
+        chat.registry.add("DeleteSkillAttribution", self.handle_skill_cancelled)
+        if self.api is None:
+            self.api = chat.api
+        if self.channel_id is None:
+            self.channel_id = chat.channel.id
+
+    def detach(self, chat):
+        chat.registry.remove("SkillAttribution", self.handle_skill)
+        chat.registry.remove("DeleteSkillAttribution", self.handle_skill_cancelled)
+
+    async def handle_skill(self, data):
+        skill = data.get("skill") or dict()
+        currency = (skill.get("currency") or "").lower()
+        amount = skill.get("cost") or 0
+        user_id = data.get("user_id")
+        if user_id is None or amount <= 0:
+            return
+
+        self.usernames[user_id] = data.get("user_name")
+        execution_id = skill.get("execution_id") or data.get("id")
+        self.add(user_id, currency, amount, execution_id)
+
+    async def handle_skill_cancelled(self, data):
+        execution_id = data.get("execution_id") or (data.get("skill") or dict()).get("execution_id")
+        self.cancel(execution_id)
+
+    def add(self, user_id, currency, amount, execution_id = None, now = None):
+        """Adds an amount of currency spent by a user to every window."""
+        now = now if now is not None else time.time()
+        self.roll(now)
+        for (board_currency, _), board in self.boards.items():
+            if board_currency == currency:
+                board.add(user_id, amount)
+        self.events += 1
+
+        if execution_id is not None:
+            self.executions[execution_id] = (user_id, currency, amount, now)
+            if len(self.executions) > self.execution_history:
+                self.executions.popitem(last = False)
+
+    def cancel(self, execution_id, now = None):
+        """Undoes a previously added skill execution.
+
+        Returns:
+            bool: Indicates if the execution was known (and subtracted).
+        """
+        execution = self.executions.pop(execution_id, None)
+        if execution is None:
+            return False
+
+        user_id, currency, amount, timestamp = execution
+        self.roll(now if now is not None else time.time())
+        for (board_currency, window), board in self.boards.items():
+
+            # windows which reset since the execution no longer include it
+            period = self.periods[window]
+            if board_currency == currency and (period is None or timestamp >= period):
+                board.add(user_id, -amount)
+        self.cancelled += 1
+        return True
+
+    def roll(self, now):
+        """Resets windows whose period ended."""
+        for window, period in self.periods.items():
+            if period is None:
+                continue
+            current = window_start(window, now)
+            if current != period:
+                self.periods[window] = current
+                for (_, board_window), board in self.boards.items():
+                    if board_window == window:
+                        board.clear()
+
+    def top(self, currency, window = "weekly", count = 10):
+        """Gets the highest ranking users of a leaderboard.
+
+        Returns:
+            list: Dicts with 'user_id', 'username' and 'total', highest total first.
+        """
+        self.roll(time.time())
+        board = self.boards[(currency, window)]
+        return [
+            { "user_id": user_id, "username": self.usernames.get(user_id), "total": total }
+            for user_id, total in board.top(count)
+        ]
+
+    def total(self, user_id, currency, window = "weekly"):
+        """int: The total a user spent in a window."""
+        return self.boards[(currency, window)].totals.get(user_id, 0)
+
+    async def reconcile(self):
+        """Replaces local totals with the REST leaderboards, which are authoritative.
+
+        Returns:
+            int: Amount of users whose local total differed from the REST leaderboard.
+        """
+        drift = 0
+        for (currency, window), board in self.boards.items():
+            if window == "session":
+                continue
+
+            type = "{}-{}".format(currency, window)
+            entries = await self.api.get_leaderboard(type, self.channel_id, self.reconcile_limit)
+            # an empty board is more likely a failed or lagging request than every total being gone
+            if not isinstance(entries, list) or len(entries) == 0:
+                continue
+
+            remote = dict()
+            for entry in entries:
+                user_id = entry.get("userId")
+                remote[user_id] = entry.get("statValue") or 0
+                self.usernames.setdefault(user_id, entry.get("username"))
+
+            # only the top users are returned, local totals ranked below them are kept
+            floor = min(remote.values()) if len(remote) >= self.reconcile_limit else 0
+            for user_id, total in list(board.totals.items()):
+                if user_id not in remote and total >= floor:
+                    drift += 1
+                    board.add(user_id, -total)
+            for user_id, total in remote.items():
+                difference = total - board.totals.get(user_id, 0)
+                if difference:
+                    drift += 1
+                    board.add(user_id, difference)
+
+        self.last_reconcile = time.time()
+        return drift
+
+    async def run(self, interval = 300):
+        """Reconciles with the REST leaderboards every 'interval' seconds, until cancelled."""
+        while True:
+            try:
+                drift = await self.reconcile()
+                logger.debug("Reconciled leaderboards of channel %s, %d users corrected.", self.channel_id, drift)
+            except Exception:
+                logger.exception("Failed to reconcile leaderboards of channel %s.", self.channel_id)
+            await asyncio.sleep(interval)
@@ -0,0 +1,147 @@
+import time
+from datetime import timedelta
+
+from .objects import MixerChannel
+
+class MixerLiveChannel(MixerChannel):
+    """A MixerChannel kept up to date by Constellation events instead of REST requests.
+
+    Partial payloads from "channel:{id}:update" are merged into the channel data, and
+    "channel:{id}:broadcast" tracks when the stream went online, so viewers, followers,
+    online and uptime can be read at any time without polling.
+
+    Example:
+        live = await MixerLiveChannel.create(api, constellation, "username")
+
+        @live.on_update
+        async def changed(channel, changes):
+            print(channel.viewers, changes)
+    """
+
+    def __init__(self, data, constellation, user = None):
+        super().__init__(data, user)
+        self.constellation = constellation
+        self.listeners = list()
+        self.subscribed = False
+
+        # unix timestamp of the broadcast start, or None while offline
+        self.started = None
+        self.last_update = None
+
+    @classmethod
+    async def create(cls, api, constellation, id_or_token):
+        """Fetches a channel once, then keeps it up to date through Constellation.
+
+        Args:
+            api (:class:`mixer.api.MixerAPI`): Used for the initial channel & broadcast requests.
+            constellation (:class:`mixer.constellation.MixerConstellation`): Connected Constellation client.
+            id_or_token (str): Username (or id) of Mixer channel.
+
+        Returns:
+            :class:`mixer.live.MixerLiveChannel`: Subscribed live channel.
+        """
+        channel = await api.get_channel(id_or_token, cached = False) # live state has to be current
+        live = cls(channel.data, constellation)
+        live.set_api(api)
+
+        # the broadcast start time isn't part of the channel, so look it up once
+        if live.online:
+            broadcast = await api.get_broadcast(live.id)
+            if "error" not in broadcast and broadcast.get("online"):
+                live.set_started(broadcast.get("startedAt"))
+
+        await live.subscribe()
+        return live
+
+    @property
+    def events(self):
+        """list: The Constellation events this channel subscribes to."""
+        return ["channel:{}:update".format(self.id), "channel:{}:broadcast".format(self.id)]
+
+    def on_update(self, func):
+        """Decorator, registers a coroutine called with (channel, changes) after every update."""
+        self.listeners.append(func)
+        return func
+
+    async def subscribe(self):
+        """Subscribes to this channel's update & broadcast events."""
+        if self.subscribed:
+            return
+        await self.constellation.subscribe(self.events, self.handle_event)
+        self.subscribed = True
+
+    async def unsubscribe(self):
+        """Stops receiving updates, leaving the last known state in place."""
+        if not self.subscribed:
+            return
+        await self.constellation.unsubscribe(self.events)
+        self.subscribed = False
+
+    async def handle_event(self, packet, payload):
+        """Constellation callback, merges a (partial) payload into the channel state."""
+
+        event = packet["data"]["channel"]
+        if event.endswith(":broadcast"):
+            changes = self.apply_broadcast(payload)
+        else:
+            changes = self.apply_update(payload)
+
+        self.last_update = time.time()
+        for listener in self.listeners:
+            await listener(self, changes)
+
+    def apply_update(self, payload):
+        """Merges a "channel:{id}:update" payload into the channel data.
+
+        Returns:
+            dict: The fields whose values changed.
+        """
+        changes = { key: value for key, value in payload.items() if self.data.get(key) != value }
+        self.data.update(changes)
+
+        # updates carry 'online' too, but no start time: approximate it until a broadcast event arrives
+        if "online" in changes:
+            if not changes["online"]:
+                self.started = None
+            elif self.started is None:
+                self.started = time.time()
+
+        return changes
+
+    def apply_broadcast(self, payload):
+        """Applies a "channel:{id}:broadcast" payload to the channel's online state.
+
+        Returns:
+            dict: The fields whose values changed.
+        """
+        changes = dict()
+        online = payload.get("online")
+        if online is not None and self.data.get("online") != online:
+            self.data["online"] = changes["online"] = online
+
+        if online is False:
+            self.started = None
+        elif "startedAt" in payload:
+            self.set_started(payload["startedAt"])
+        elif online and self.started is None:
+            self.started = time.time()
+
+        return changes
+
+    def set_started(self, started_at):
+        """Sets the broadcast start time from an ISO 8601 timestamp (ex: broadcast "startedAt")."""
+        if not started_at:
+            return
+        import dateutil.parser # imported on first use, it's slow to import
+        self.started = dateutil.parser.parse(started_at).timestamp()
+
+    @property
+    def uptime(self):
+        """datetime.timedelta: Duration of the active broadcast, None if it's offline."""
+        if not self.online or self.started is None:
+            return None
+        return timedelta(seconds = int(max(time.time() - self.started, 0)))
+
+    async def get_uptime(self):
+        """datetime.timedelta: The duration of the active broadcast, computed locally."""
+        return self.uptime
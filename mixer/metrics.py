@@ -0,0 +1,268 @@
+import asyncio
+import inspect
+import logging
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+class MixerMetric:
+    """Base class for a labelled metric, values are stored per tuple of label values."""
+
+    type = None
+
+    def __init__(self, name, description, labels = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.values = dict()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _format_labels(self, key, extra = None):
+        pairs = list(zip(self.labels, key))
+        if extra is not None:
+            pairs.append(extra)
+        if len(pairs) == 0:
+            return ""
+        escape = lambda v: v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        return "{" + ",".join('{}="{}"'.format(k, escape(v)) for k, v in pairs) + "}"
+
+    def samples(self):
+        """list: Tuples of (name, labels, value) to expose."""
+        return [(self.name, self._format_labels(key), value) for key, value in self.values.items()]
+
+    def snapshot(self):
+        """dict: Values keyed by tuple of label values."""
+        return dict(self.values)
+
+class MixerCounter(MixerMetric):
+
+    type = "counter"
+
+    def inc(self, amount = 1, **labels):
+        """Increments the counter for the given label values."""
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+class MixerGauge(MixerMetric):
+
+    type = "gauge"
+
+    def __init__(self, name, description, labels = ()):
+        super().__init__(name, description, labels)
+        self.functions = dict()
+
+    def set(self, value, **labels):
+        """Sets the gauge to a value."""
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount = 1, **labels):
+        """Increments (or decrements, if amount is negative) the gauge."""
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def set_function(self, func, **labels):
+        """Computes the gauge value by calling func whenever metrics are collected."""
+        self.functions[self._key(labels)] = func
+
+    def remove(self, **labels):
+        """Stops reporting the gauge for the given label values."""
+        key = self._key(labels)
+        self.values.pop(key, None)
+        self.functions.pop(key, None)
+
+    def remove_matching(self, **labels):
+        """Stops reporting the gauge for every label set which includes the given label values."""
+        match = [(self.labels.index(label), str(value)) for label, value in labels.items()]
+        for values in (self.values, self.functions):
+            for key in [key for key in values if all(key[i] == value for i, value in match)]:
+                del values[key]
+
+    def snapshot(self):
+        values = dict(self.values)
+        for key, func in self.functions.items():
+            values[key] = func()
+        return values
+
+    def samples(self):
+        return [(self.name, self._format_labels(key), value) for key, value in self.snapshot().items()]
+
+class MixerHistogram(MixerMetric):
+
+    type = "histogram"
+
+    def __init__(self, name, description, labels = (), buckets = DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Records an observation (usually a duration in seconds)."""
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            # bucket counts (+inf last), sum, count
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def snapshot(self):
+        snapshot = dict()
+        for key, (counts, total, count) in self.values.items():
+            snapshot[key] = { "buckets": dict(zip(self.buckets + (float("inf"),), counts)), "sum": total, "count": count }
+        return snapshot
+
+    def samples(self):
+        samples = list()
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, amount in zip(self.buckets + ("+Inf",), counts):
+                cumulative += amount
+                samples.append((self.name + "_bucket", self._format_labels(key, ("le", str(bound))), cumulative))
+            samples.append((self.name + "_sum", self._format_labels(key), total))
+            samples.append((self.name + "_count", self._format_labels(key), count))
+        return samples
+
+class MixerMetrics:
+    """Collection of metrics for the chat and API hot paths.
+
+    Instrumented code checks the 'enabled' attribute before recording anything,
+    so metrics cost a single attribute lookup while disabled (the default).
+    """
+
+    def __init__(self, enabled = False):
+        self.enabled = enabled
+        self.metrics = dict()
+        self._sinks = list()
+
+        self.chat_packets = self.counter("mixer_chat_packets_total", "Packets received from the chat server.", ["event"])
+        self.command_dispatch = self.histogram("mixer_command_dispatch_seconds", "Time to parse and dispatch a chat command.", ["command"])
+        self.command_handler = self.histogram("mixer_command_handler_seconds", "Time spent running a chat command handler.", ["command"])
+        self.api_latency = self.histogram("mixer_api_request_seconds", "Latency of MixerAPI requests.", ["method", "route"])
+        self.api_responses = self.counter("mixer_api_responses_total", "MixerAPI responses by status code.", ["method", "route", "status"])
+        self.inbound_depth = self.gauge("mixer_chat_inbound_queue_depth", "Packets waiting in the chat packet pipeline.", ["channel"])
+        self.outbound_depth = self.gauge("mixer_chat_outbound_queue_depth", "Packets waiting to be sent to the chat server.", ["channel"])
+        self.chat_messages_per_minute = self.gauge("mixer_chat_messages_per_minute", "Chat messages per minute over the last closed analytics window.", ["channel"])
+        self.chat_unique_chatters = self.gauge("mixer_chat_unique_chatters", "Approximate unique chatters in the last closed analytics window.", ["channel"])
+        self.chat_top_items = self.gauge("mixer_chat_top_items", "Approximate usage of the most used commands and emotes in the last closed analytics window.", ["channel", "kind", "key"])
+        self.ws_bytes = self.counter("mixer_ws_bytes_total", "Websocket bytes, as json payloads and on the wire (after compression).", ["direction", "encoding"])
+        self.oauth_refreshes = self.counter("mixer_oauth_refresh_total", "OAuth token refreshes.", ["trigger"])
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, description, labels = ()):
+        """:class:`MixerCounter`: Registers a new counter."""
+        return self._register(MixerCounter(name, description, labels))
+
+    def gauge(self, name, description, labels = ()):
+        """:class:`MixerGauge`: Registers a new gauge."""
+        return self._register(MixerGauge(name, description, labels))
+
+    def histogram(self, name, description, labels = (), buckets = DEFAULT_BUCKETS):
+        """:class:`MixerHistogram`: Registers a new histogram."""
+        return self._register(MixerHistogram(name, description, labels, buckets))
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def render(self):
+        """str: Renders every metric in the Prometheus text exposition format."""
+        lines = list()
+        for metric in self.metrics.values():
+            lines.append("# HELP {} {}".format(metric.name, metric.description))
+            lines.append("# TYPE {} {}".format(metric.name, metric.type))
+            for name, labels, value in metric.samples():
+                lines.append("{}{} {}".format(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """dict: Current values of every metric, keyed by metric name."""
+        return { name: metric.snapshot() for name, metric in self.metrics.items() }
+
+    def add_sink(self, callback):
+        """Adds a callback which receives a snapshot every time metrics are flushed.
+
+        Args:
+            callback (function): Function or coroutine function taking a snapshot dict.
+        """
+        self._sinks.append(callback)
+
+    async def flush(self):
+        """Passes a snapshot of every metric to each sink."""
+        snapshot = self.snapshot()
+        for sink in self._sinks:
+            try:
+                if inspect.iscoroutinefunction(sink):
+                    await sink(snapshot)
+                else:
+                    sink(snapshot)
+            except Exception:
+                logger.exception("metrics sink %r failed", sink)
+
+    async def run_sinks(self, interval = 10):
+        """Flushes metrics to every sink periodically, until cancelled.
+
+        Args:
+            interval (float): Seconds between flushes.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+class MixerMetricsServer:
+    """Minimal HTTP listener which serves metrics for Prometheus-style scraping."""
+
+    def __init__(self, metrics, host = "127.0.0.1", port = 9100, path = "/metrics"):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.path = path
+        self.server = None
+
+    async def start(self):
+        """Starts listening for scrape requests."""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stops the listener."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+
+            # skip the request headers
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == self.path:
+                status = "200 OK"
+                body = self.metrics.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b"not found\n"
+
+            headers = "HTTP/1.1 {}\r\nContent-Type: text/plain; version=0.0.4\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+            writer.write(headers.format(status, len(body)).encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+# default metrics instance used by the library
+metrics = MixerMetrics()
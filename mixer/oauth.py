@@ -1,7 +1,8 @@
-import json, asyncio, inspect, logging
+import json, asyncio, inspect, logging, random
 from time import time
 
 from . import exceptions as MixerExceptions
+from .metrics import metrics
 
 # mixer recaptcha v2 sitekey:
 # 6LeYS2gUAAAAAPVr3SzjSJYtfD7iBxS5yyWS0IuH
@@ -10,26 +11,49 @@ from . import exceptions as MixerExceptions
 # post: username, password, captcha
 # create session and automate oauth login?
 
+logger = logging.getLogger(__name__)
+
 class MixerOAuth:
 
     @classmethod
-    async def create_from_authorization_code(cls, api, code):
+    async def create_from_authorization_code(cls, api, code, token_store = None):
         self = MixerOAuth()
         self.api = api
+        self.access_token = None
         self.refresh_token = code
+        self.token_store = token_store
         await self.refresh(is_refresh = False)
         return self
 
 
     @classmethod
-    async def create(cls, api, access_token, refresh_token):
+    async def create(cls, api, access_token, refresh_token, token_store = None):
         self = MixerOAuth()
         self.api = api
         self.access_token = access_token
         self.refresh_token = refresh_token
+        self.token_store = token_store
         await self.update_token_data()
         return self
 
+    @classmethod
+    async def create_from_store(cls, api, token_store):
+        """Creates an OAuth wrapper from tokens kept in a shared token store.
+
+        Args:
+            api (MixerAPI): Mixer API wrapper.
+            token_store (MixerTokenStore): Store containing tokens saved by another MixerOAuth.
+        """
+        self = MixerOAuth()
+        self.api = api
+        self.token_store = token_store
+        loop = asyncio.get_event_loop()
+        data = await loop.run_in_executor(None, token_store.load)
+        if data is None:
+            raise ValueError("token store doesn't contain any tokens.")
+        self._load_tokens(data)
+        return self
+
     def __init__(self):
 
         # array of methods to invoke once access_token is refreshed
@@ -39,6 +63,22 @@ class MixerOAuth:
         # scheduled task to refresh tokens
         self._auto_refresh_task = None
 
+        # refresh currently in progress, shared by concurrent callers
+        self._refresh_task = None
+
+        # optional MixerTokenStore, shares tokens with other instances/processes
+        self.token_store = None
+
+        # auto-refresh happens this many seconds before expiry, minus up to 'refresh_jitter' seconds
+        # (jitter keeps many processes/accounts from refreshing at the same moment)
+        self.refresh_margin = 60
+        self.refresh_jitter = 30
+
+        # identity of the token owner, determined by introspecting the token
+        self.user_id = None
+        self.username = ""
+        self.expires = -1
+
     async def update_token_data(self):
         data = await self.api.check_token(self.access_token)
         active = data.get("active")
@@ -54,16 +94,93 @@ class MixerOAuth:
     async def refresh(self, auto_refreshed = False, is_refresh = True):
         """Refreshes tokens and triggers callbacks w/ new tokens.
 
+        Concurrent calls share a single refresh, so the refresh token is only used once.
+
         Args:
             auto_refreshed (bool): Indicates that this token refresh was automated by a task.
             is_refresh (bool): If false, the refresh token will be used as an authorization code.
         """
 
+        # if a refresh is already in progress, wait for it rather than starting another
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.ensure_future(self._refresh(auto_refreshed, is_refresh))
+            self._refresh_task.add_done_callback(self._refresh_done)
+
+        # shielded, so a cancelled caller doesn't cancel the refresh for everyone else
+        await asyncio.shield(self._refresh_task)
+
+    def _refresh_done(self, task):
+        self._refresh_task = None
+
+    def _release_abandoned_lock(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.token_store.release()
+
+    async def _refresh(self, auto_refreshed, is_refresh):
+
+        if self.token_store is None:
+            await self._refresh_tokens(auto_refreshed, is_refresh)
+        else:
+            # hold the store's lock, so only one process refreshes at a time
+            loop = asyncio.get_event_loop()
+            acquired = loop.run_in_executor(None, self.token_store.acquire)
+            try:
+                # shielded, since cancelling doesn't stop the thread waiting for the lock
+                await asyncio.shield(acquired)
+            except asyncio.CancelledError:
+                # the thread takes the lock after we stopped waiting, so release it as soon as it does
+                acquired.add_done_callback(self._release_abandoned_lock)
+                raise
+            try:
+                stored = await loop.run_in_executor(None, self.token_store.load)
+                if stored is not None and stored.get("access_token") != self.access_token and stored.get("expires", -1) > time():
+                    # another instance/process already refreshed, use its tokens
+                    self._load_tokens(stored)
+                else:
+                    if stored is not None and is_refresh:
+                        # our refresh token may have been used by someone else already
+                        self.refresh_token = stored.get("refresh_token", self.refresh_token)
+                    await self._refresh_tokens(auto_refreshed, is_refresh)
+                    await loop.run_in_executor(None, self.token_store.save, self._dump_tokens())
+            finally:
+                self.token_store.release()
+
+        await self._trigger_refreshed(auto_refreshed)
+
+    async def _refresh_tokens(self, auto_refreshed, is_refresh):
+
+        if metrics.enabled:
+            metrics.oauth_refreshes.inc(trigger = "auto" if auto_refreshed else "manual")
+
         # refresh tokens
         tokens = await self.api.get_token(self.refresh_token, refresh = is_refresh)
         self.access_token = tokens.get("access_token")
         self.refresh_token = tokens.get("refresh_token")
-        await self.update_token_data()
+
+        # the token response includes its lifetime, so only introspect if we don't know who the token belongs to
+        expires_in = tokens.get("expires_in")
+        if expires_in is None or self.user_id in (None, -1):
+            await self.update_token_data()
+        else:
+            self.expires = time() + expires_in - 10
+
+    def _load_tokens(self, data):
+        self.access_token = data["access_token"]
+        self.refresh_token = data["refresh_token"]
+        self.expires = data.get("expires", -1)
+        self.user_id = data.get("user_id", -1)
+        self.username = data.get("username", "")
+
+    def _dump_tokens(self):
+        return {
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expires": self.expires,
+            "user_id": self.user_id,
+            "username": self.username
+        }
+
+    async def _trigger_refreshed(self, auto_refreshed):
 
         # trigger callbacks w/ new tokens
         for event in self._refreshed:
@@ -84,17 +201,18 @@ class MixerOAuth:
 
     async def _auto_refresh(self):
 
-        # determine time to wait before a refresh, make sure it's at least 0
-        delay = self.expires - time()
+        # determine time to wait before a refresh (early, with jitter), make sure it's at least 0
+        delay = self.expires - time() - self.refresh_margin - random.uniform(0, self.refresh_jitter)
         if delay < 0:
             delay = 0
 
         # sleep until we should refresh the token
-        print("waiting {} seconds before automatically refreshing tokens...".format(delay))
+        logger.debug("waiting %.1f seconds before automatically refreshing tokens for %s", delay, self.username)
         await asyncio.sleep(delay)
 
         # refresh tokens
         await self.refresh(auto_refreshed = True)
+        logger.info("automatically refreshed tokens for %s", self.username)
 
         # schedule this function as a task so we can automatically do it again
         self.register_auto_refresh()
@@ -103,6 +221,12 @@ class MixerOAuth:
         """Registers a task that will endlessly ensure the tokens are valid."""
         self._auto_refresh_task = asyncio.create_task(self._auto_refresh())
 
+    def close(self):
+        """Stops automatically refreshing the tokens."""
+        if self._auto_refresh_task is not None:
+            self._auto_refresh_task.cancel()
+            self._auto_refresh_task = None
+
     def on_refresh(self, callback):
         """Adds a callback to be triggered when tokens are updated."""
         self._refreshed.append(callback)
@@ -1,5 +1,3 @@
-import dateutil.parser
-
 # https://dev.mixer.com/rest/index.html#TimeStamped
 class TimeStamped:
 
@@ -8,7 +6,10 @@ class TimeStamped:
 
     def __datetime(self, name):
         str = self.data.get(name)
-        return dateutil.parser.parse(str) if str else None
+        if not str:
+            return None
+        import dateutil.parser # imported on first use, it's slow to import
+        return dateutil.parser.parse(str)
 
     @property
     def created_at(self):
@@ -276,6 +277,9 @@ class MixerChatMessage:
     def __init__(self, data):
         self.data = data
 
+    # name of the command this message invoked, set by ChatCommands.handle
+    command = None
+
     @property
     def id(self):
         """str: The unique identifier of the message."""
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import deque
+
+class MixerOutboundQueue:
+    """Rate limited queue between MixerChat and the chat websocket.
+
+    Packets are sent by a single worker task, at most 'rate' per second on average with bursts of
+    up to 'burst' packets (a token bucket). Moderation packets skip ahead of queued chat messages.
+    """
+
+    # methods which shouldn't wait behind a backlog of messages
+    PRIORITY_METHODS = {"deleteMessage", "purge", "clearMessages", "timeout"}
+
+    def __init__(self, send, rate = 5, burst = 10):
+        """
+        Args:
+            send (function): Coroutine function which sends a single packet.
+            rate (float): Packets sent per second on average, None disables rate limiting.
+            burst (int): Packets which may be sent back to back after being idle.
+        """
+        self.send = send
+        self.rate = rate
+        self.burst = burst
+
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.sent = 0
+
+        self._priority = deque()
+        self._queue = deque()
+        self._ready = None
+        self._worker = None
+
+    @property
+    def depth(self):
+        """int: Amount of packets waiting to be sent."""
+        return len(self._priority) + len(self._queue)
+
+    @property
+    def backlog(self):
+        """float: Estimated seconds before a packet queued now would be sent."""
+        if self.rate is None:
+            return 0
+        tokens = min(self.burst, self.tokens + (time.monotonic() - self.updated) * self.rate)
+        return max(self.depth + 1 - tokens, 0) / self.rate
+
+    def put(self, packet):
+        """Queues a packet.
+
+        Returns:
+            asyncio.Future: Resolved once the packet was sent (or with the exception sending it raised).
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        queue = self._priority if packet.get("method") in self.PRIORITY_METHODS else self._queue
+        queue.append((packet, future))
+
+        # the worker is created on first use, inside the running event loop
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+        self._ready.set()
+        return future
+
+    async def _acquire(self):
+        """Waits until a token is available and takes it."""
+        if self.rate is None:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def _run(self):
+        while True:
+            if not self._priority and not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            await self._acquire()
+            packet, future = (self._priority or self._queue).popleft()
+            if future.cancelled():
+                self.tokens += 1
+                continue
+            try:
+                await self.send(packet)
+                self.sent += 1
+                future.set_result(packet["id"])
+            except Exception as e:
+                future.set_exception(e)
+
+    async def drain(self, timeout = None):
+        """Waits until every queued packet was sent.
+
+        Returns:
+            bool: False if the timeout passed before the queue was empty.
+        """
+        pending = [future for _, future in list(self._priority) + list(self._queue)]
+        if not pending:
+            return True
+        done, not_done = await asyncio.wait(pending, timeout = timeout)
+        return len(not_done) == 0
+
+    def close(self):
+        """Stops the worker, failing every packet which wasn't sent yet."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        while self._priority or self._queue:
+            _, future = (self._priority or self._queue).popleft()
+            if not future.done():
+                future.set_exception(ConnectionError("The outbound queue was closed before the packet was sent."))
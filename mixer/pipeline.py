@@ -0,0 +1,160 @@
+import asyncio
+import random
+from collections import Counter
+from enum import IntEnum
+
+class PacketPriority(IntEnum):
+    REPLY = 0
+    MODERATION = 1
+    EVENT = 2
+    COMMAND = 3
+    MESSAGE = 4
+
+class MixerPacketPipeline:
+    """Priority queue between the chat websocket and the packet handlers.
+
+    Replies and moderation events are always handled before ordinary chat messages.
+    Once the backlog grows past sample_threshold, non-command chat messages are sampled,
+    and past shed_threshold they are dropped entirely.
+
+    Since moderation events skip ahead, messages which were queued before a DeleteMessage,
+    PurgeMessage or ClearMessages that removes them are dropped instead of handled.
+    """
+
+    # events which should never wait behind a flood of chat messages
+    MODERATION_EVENTS = {"DeleteMessage", "PurgeMessage", "ClearMessages", "UserTimeout"}
+
+    def __init__(self, prefix = None, sample_threshold = 200, shed_threshold = 1000, sample_rate = 0.25):
+        self.prefix = prefix
+        self.sample_threshold = sample_threshold
+        self.shed_threshold = shed_threshold
+        self.sample_rate = sample_rate
+        self._queue = asyncio.PriorityQueue()
+        self._sequence = 0 # keeps packets of equal priority in the order they arrived
+
+        # counters keyed by priority name (received/handled) or event name (dropped/sampled)
+        self.received = Counter()
+        self.dropped = Counter()
+        self.sampled = Counter()
+        self.moderated = 0 # messages dropped because they were removed while queued
+
+        # sequence numbers of queued moderation events, only kept while older packets are queued
+        self._deleted = dict() # message id -> sequence of the DeleteMessage
+        self._purged = dict() # user id -> sequence of the latest PurgeMessage
+        self._cleared = -1 # sequence of the latest ClearMessages
+
+    def classify(self, packet):
+        """Determines the priority of a packet received from the chat server.
+
+        Args:
+            packet (dict): Decoded packet from the chat websocket.
+
+        Returns:
+            PacketPriority: The priority this packet should be handled with.
+        """
+
+        if packet.get("type") == "reply":
+            return PacketPriority.REPLY
+
+        event = packet.get("event")
+        if event in self.MODERATION_EVENTS:
+            return PacketPriority.MODERATION
+        if event != "ChatMessage":
+            return PacketPriority.EVENT
+
+        # chat messages starting with the command prefix are commands
+        if self.prefix:
+            try:
+                fragments = packet["data"]["message"]["message"]
+                if fragments and fragments[0].get("text", "").startswith(self.prefix):
+                    return PacketPriority.COMMAND
+            except (KeyError, TypeError):
+                pass
+
+        return PacketPriority.MESSAGE
+
+    def put(self, packet):
+        """Queues a packet, unless it's an ordinary chat message and the pipeline is overloaded.
+
+        Args:
+            packet (dict): Decoded packet from the chat websocket.
+
+        Returns:
+            bool: Indicates if the packet was queued (False if it was shed or sampled out).
+        """
+
+        priority = self.classify(packet)
+        self.received[priority.name] += 1
+
+        if priority is PacketPriority.MESSAGE:
+            depth = self._queue.qsize()
+            if depth >= self.shed_threshold:
+                self.dropped[packet["event"]] += 1
+                return False
+            if depth >= self.sample_threshold and random.random() >= self.sample_rate:
+                self.sampled[packet["event"]] += 1
+                return False
+
+        if priority is PacketPriority.MODERATION:
+            self._record_moderation(packet)
+
+        self._queue.put_nowait((priority, self._sequence, packet))
+        self._sequence += 1
+        return True
+
+    def _record_moderation(self, packet):
+        event, data = packet.get("event"), packet.get("data") or dict()
+        if event == "DeleteMessage":
+            self._deleted[data.get("id")] = self._sequence
+        elif event == "PurgeMessage":
+            self._purged[data.get("user_id")] = self._sequence
+        elif event == "ClearMessages":
+            self._cleared = self._sequence
+
+    def _is_moderated(self, sequence, packet):
+        """bool: Indicates that a chat message was removed by a moderation event queued after it."""
+        if packet.get("event") != "ChatMessage":
+            return False
+        data = packet.get("data") or dict()
+        if sequence < self._cleared:
+            return True
+        if sequence < self._purged.get(data.get("user_id"), -1):
+            return True
+        return sequence < self._deleted.pop(data.get("id"), -1)
+
+    async def get(self):
+        """dict: Waits for the next packet to handle, or None once the pipeline is closed."""
+        while True:
+            _, sequence, packet = await self._queue.get()
+            moderated = packet is not None and (self._deleted or self._purged or self._cleared >= 0) and self._is_moderated(sequence, packet)
+
+            # nothing older than the recorded moderation events is queued anymore
+            if self._queue.empty():
+                self._deleted.clear()
+                self._purged.clear()
+                self._cleared = -1
+
+            if not moderated:
+                return packet
+            self.moderated += 1
+
+    def close(self):
+        """Signals consumers to stop once every queued packet has been handled."""
+        self._queue.put_nowait((len(PacketPriority), self._sequence, None))
+        self._sequence += 1
+
+    @property
+    def depth(self):
+        """int: Amount of packets waiting to be handled."""
+        return self._queue.qsize()
+
+    @property
+    def stats(self):
+        """dict: Counters describing what the pipeline received, dropped and sampled out."""
+        return {
+            "depth": self.depth,
+            "received": dict(self.received),
+            "dropped": dict(self.dropped),
+            "sampled": dict(self.sampled),
+            "moderated": self.moderated
+        }
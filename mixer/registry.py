@@ -0,0 +1,182 @@
+import inspect
+
+class MixerEventRegistry:
+    """Stores any number of handlers per event and compiles them into a dispatch table.
+
+    A registry can be shared between several :class:`mixer.chat.MixerChat` instances,
+    so handlers only need to be registered once for every channel a bot is in.
+    """
+
+    def __init__(self, aliases = None):
+
+        # packet event name -> handler name (ex: "UserJoin" -> "user_joined")
+        self.aliases = dict(aliases or dict())
+
+        # handler name -> list of registered handler entries
+        self._handlers = dict()
+        self._registered = 0
+
+        # event name -> tuple of (handler, arity) pairs, rebuilt after changes (see compile)
+        self._table = None
+
+    def add_aliases(self, aliases):
+        """Maps packet event names to handler names, keeping aliases the registry already has.
+
+        Handlers already registered under a packet event name are moved to its handler name.
+
+        Args:
+            aliases (dict): Packet event name -> handler name (ex: "UserJoin" -> "user_joined").
+        """
+        for event, name in aliases.items():
+            if event in self.aliases:
+                continue
+            self.aliases[event] = name
+            entries = self._handlers.pop(event, None)
+            if entries:
+                self._handlers.setdefault(name, list()).extend(entries)
+        self._table = None
+
+    def add(self, name, func, order = 0, users = None, roles = None, filter = None):
+        """Registers a coroutine function as a handler for an event.
+
+        Args:
+            name (str): Handler name (ex: 'user_joined') or packet event name (ex: 'UserJoin').
+            func (function): The coroutine function to invoke.
+            order (int): Handlers with a lower order are invoked first.
+            users (list): Only invoke for these usernames/user ids.
+            roles (list): Only invoke if the user has one of these roles.
+            filter (function): Only invoke if filter(*args) returns True.
+
+        Returns:
+            bool: Indicates if the handler was registered.
+        """
+
+        if not inspect.iscoroutinefunction(func):
+            return False
+
+        # handlers may accept fewer arguments than an event provides (ex: only 'data'),
+        # in which case the extra arguments are left out when it's invoked
+        params = inspect.signature(func).parameters.values()
+        if any(p.kind is p.VAR_POSITIONAL for p in params):
+            arity = None
+        else:
+            arity = sum(1 for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD))
+
+        name = self.aliases.get(name, name)
+        entry = {
+            "function": func,
+            "arity": arity,
+            "order": order,
+            "registered": self._registered, # keeps registration order for equal 'order' values
+            "users": set(users) if users else None,
+            "roles": set(roles) if roles else None,
+            "filter": filter
+        }
+
+        self._handlers.setdefault(name, list()).append(entry)
+        self._registered += 1
+        self._table = None
+        return True
+
+    def remove(self, name, func):
+        """Unregisters a handler which was previously added.
+
+        Args:
+            name (str): Handler name or packet event name.
+            func (function): The coroutine function that was registered.
+        """
+        name = self.aliases.get(name, name)
+        entries = self._handlers.get(name, [])
+        self._handlers[name] = [e for e in entries if e["function"] is not func]
+        self._table = None
+
+    def compile(self):
+        """Builds the dispatch table, mapping event names directly to a tuple of handlers.
+
+        Returns:
+            dict: Event name -> tuple of (coroutine function, arity) pairs, in invocation order.
+        """
+
+        table = dict()
+        for name, entries in self._handlers.items():
+            entries = sorted(entries, key = lambda e: (e["order"], e["registered"]))
+            table[name] = tuple((self._wrap(entry), entry["arity"]) for entry in entries)
+
+        # allow handlers to be looked up by packet event name as well
+        for event, name in self.aliases.items():
+            if name in table:
+                table[event] = table[name]
+
+        self._table = table
+        return table
+
+    def handlers(self, name):
+        """tuple: Gets the (handler, arity) pairs which will be invoked for an event."""
+        table = self._table if self._table is not None else self.compile()
+        return table.get(name, ())
+
+    async def dispatch(self, name, *args):
+        """Invokes every handler registered for an event, in order.
+
+        Args:
+            name (str): Handler name or packet event name.
+            *args: Arguments passed to each handler.
+        """
+        table = self._table if self._table is not None else self.compile()
+        for handler, arity in table.get(name, ()):
+            await handler(*args[:arity])
+
+    def _wrap(self, entry):
+        """Returns the handler itself, or a wrapper applying its filters."""
+
+        func = entry["function"]
+        users, roles, check = entry["users"], entry["roles"], entry["filter"]
+        if users is None and roles is None and check is None:
+            return func
+
+        async def filtered(*args):
+            if users is not None or roles is not None:
+                user_id, username, user_roles = subject(args[0] if args else None)
+                if users is not None and user_id not in users and username not in users:
+                    return
+                if roles is not None and roles.isdisjoint(user_roles):
+                    return
+            if check is not None and not check(*args):
+                return
+            await func(*args)
+
+        return filtered
+
+def subject(data):
+    """Determines the user an event refers to.
+
+    Args:
+        data: A :class:`mixer.objects.MixerChatMessage` or raw event data.
+
+    Returns:
+        tuple: User id, username and list of roles (values may be None/empty).
+    """
+
+    if data is None:
+        return None, None, []
+
+    # messages and typed events (which are dicts too) know their own subject
+    if not isinstance(data, dict) or type(data) is not dict:
+        return getattr(data, "user_id", None), getattr(data, "username", None), getattr(data, "roles", None) or []
+    return data_subject(data)
+
+def data_subject(data):
+    """Determines the user raw event data refers to, see :func:`subject`."""
+
+    # some events (ex: UserTimeout) nest the user inside the payload, where 'id' is the user's id.
+    # at the top level 'id' is usually something else (ex: the message id of DeleteMessage)
+    user = data.get("user")
+    if isinstance(user, dict):
+        user_id = user.get("user_id", user.get("userId", user.get("id")))
+    else:
+        user = data
+        user_id = user.get("user_id", user.get("userId"))
+
+    username = user.get("user_name", user.get("username", user.get("userName")))
+    roles = user.get("user_roles", user.get("roles")) or []
+    return user_id, username, roles
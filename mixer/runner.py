@@ -0,0 +1,166 @@
+import asyncio
+import inspect
+import logging
+import signal
+import time
+
+logger = logging.getLogger(__name__)
+
+class MixerRunner:
+    """Runs a bot's coroutines on an event loop, and shuts the bot down gracefully.
+
+    uvloop is used if it's installed (unless disabled). On SIGINT/SIGTERM, or once the coroutines
+    finish, tracked resources are shut down in order: announcements are stopped, chats send what's
+    queued and cancel running commands, sockets are closed, OAuth refreshing is stopped, MixerAPI sessions
+    are closed and finally caches write what's pending. The time each step took is logged and kept in 'timings'.
+
+    Example:
+        runner = MixerRunner()
+
+        async def main():
+            api = runner.track(MixerAPI(client_id, client_secret))
+            chat = runner.track(await MixerChat.create(api, "channel"))
+            await chat.start(oauth)
+
+        runner.run(main())
+    """
+
+    def __init__(self, use_uvloop = True, loop_factory = None, drain_timeout = 5, signals = (signal.SIGINT, signal.SIGTERM)):
+        """
+        Args:
+            use_uvloop (bool): Use uvloop's event loop if it's installed.
+            loop_factory (function): Creates the event loop, overrides use_uvloop. Optional.
+            drain_timeout (float): Seconds each chat may spend sending queued packets while shutting down.
+            signals (tuple): Signals which start a graceful shutdown.
+        """
+        self.use_uvloop = use_uvloop
+        self.loop_factory = loop_factory
+        self.drain_timeout = drain_timeout
+        self.signals = signals
+
+        self.resources = list()
+        self.timings = dict()
+        self.loop = None
+        self._main = None
+
+    def track(self, resource):
+        """Registers a MixerAPI, MixerCache, MixerChat, MixerConstellation, MixerOAuth or MixerScheduler to shut down on exit.
+
+        Returns:
+            The resource, so it can be tracked as it's created.
+        """
+        if resource not in self.resources:
+            self.resources.append(resource)
+        return resource
+
+    def new_event_loop(self):
+        """Creates the event loop: from loop_factory, uvloop if available/enabled, or asyncio's default."""
+        if self.loop_factory is not None:
+            return self.loop_factory()
+        if self.use_uvloop:
+            try:
+                import uvloop
+                return uvloop.new_event_loop()
+            except ImportError:
+                pass
+        return asyncio.new_event_loop()
+
+    def run(self, *coros):
+        """Runs coroutines until they finish or a shutdown signal is received, then shuts down.
+
+        Returns:
+            The result of the coroutine (or a list of results, if several were provided).
+        """
+        coros = list(filter(inspect.iscoroutine, coros))
+        if not coros:
+            return None
+
+        loop = self.loop = self.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(self._run(coros))
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                asyncio.set_event_loop(None)
+                loop.close()
+                self.loop = None
+
+    async def _run(self, coros):
+        self._main = asyncio.ensure_future(coros[0] if len(coros) == 1 else asyncio.gather(*coros))
+
+        loop = asyncio.get_event_loop()
+        for sig in self.signals:
+            try:
+                loop.add_signal_handler(sig, self.stop, sig)
+            except (NotImplementedError, RuntimeError): # windows, or not on the main thread
+                pass
+
+        try:
+            return await self._main
+        except asyncio.CancelledError:
+            return None
+        finally:
+            for sig in self.signals:
+                try:
+                    loop.remove_signal_handler(sig)
+                except (NotImplementedError, RuntimeError):
+                    pass
+            await self.shutdown()
+
+    def stop(self, sig = None):
+        """Starts a graceful shutdown, by cancelling the running coroutines."""
+        if sig is not None:
+            logger.info("Received %s, shutting down.", signal.Signals(sig).name)
+        if self._main is not None:
+            self._main.cancel()
+
+    async def shutdown(self):
+        """Shuts every tracked resource down, then cancels whatever tasks are left on the loop.
+
+        Returns:
+            dict: Seconds spent on each step, and in total.
+        """
+        from .api import MixerAPI
+        from .cache import MixerCache
+        from .chat import MixerChat
+        from .constellation import MixerConstellation
+        from .oauth import MixerOAuth
+        from .scheduler import MixerScheduler, scheduler
+
+        of_type = lambda cls: [r for r in self.resources if isinstance(r, cls)]
+        started = time.perf_counter()
+        self.timings = dict()
+
+        async def step(name, coros):
+            step_started = time.perf_counter()
+            results = await asyncio.gather(*coros, return_exceptions = True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning("Error during shutdown (%s): %r", name, result)
+            self.timings[name] = time.perf_counter() - step_started
+
+        async def close(resource, *args):
+            result = resource.close(*args)
+            if inspect.isawaitable(result):
+                await result
+
+        await step("scheduler", [close(s) for s in set(of_type(MixerScheduler) + [scheduler])])
+        await step("chats", [close(chat, self.drain_timeout) for chat in of_type(MixerChat)])
+        await step("constellations", [close(c) for c in of_type(MixerConstellation)])
+        await step("oauth", [close(oauth) for oauth in of_type(MixerOAuth)])
+        await step("sessions", [close(api) for api in of_type(MixerAPI)])
+        await step("caches", [close(cache) for cache in set(of_type(MixerCache) + [api.cache for api in of_type(MixerAPI) if api.cache is not None])])
+
+        # anything still running (ex: handlers started by the application) is cancelled
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await step("tasks", tasks)
+
+        self.timings["total"] = time.perf_counter() - started
+        logger.info("Shutdown finished in %.3fs (%s).", self.timings["total"],
+            ", ".join("{} {:.3f}s".format(name, seconds) for name, seconds in self.timings.items() if name != "total"))
+        return self.timings
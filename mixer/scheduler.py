@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class MixerAnnouncement:
+    """A message sent to a chat periodically, see :meth:`MixerScheduler.add`."""
+
+    __slots__ = ("chat", "message", "interval", "min_messages", "due", "last_count", "sent", "skipped", "sending", "cancelled")
+
+    def __init__(self, chat, message, interval, min_messages, due):
+        self.chat = chat
+        self.message = message
+        self.interval = interval
+        self.min_messages = min_messages
+        self.due = due
+
+        # the chat's message count when this was last sent (or scheduled)
+        self.last_count = chat.message_count
+        self.sent = 0
+        self.skipped = 0
+        self.sending = False
+        self.cancelled = False
+
+    def cancel(self):
+        """Stops sending this announcement, it's removed from the scheduler when it's next due."""
+        self.cancelled = True
+
+    def active(self):
+        """bool: Indicates if enough messages were sent in the chat since the last announcement."""
+        return self.chat.message_count - self.last_count >= self.min_messages
+
+    async def text(self):
+        """str: The text to send, the message may be a string or a (coroutine) function returning one."""
+        message = self.message
+        if callable(message):
+            message = message()
+            if inspect.isawaitable(message):
+                message = await message
+        return message
+
+class MixerScheduler:
+    """Drives periodic chat announcements for any amount of chats from a single task.
+
+    Announcements are kept in a heap ordered by when they're next due, so the task only ever
+    sleeps until the earliest one. Messages are sent through :meth:`mixer.chat.MixerChat.send_message`,
+    so they go through each chat's rate limited outbound queue.
+
+    Example:
+        chat.announce("follow the stream!", interval = 600, min_messages = 20)
+    """
+
+    def __init__(self):
+        self._heap = list()
+        self._sequence = itertools.count() # orders announcements which are due at the same time
+        self._changed = None
+        self._task = None
+        self.tasks = set()
+
+    def add(self, chat, message, interval, min_messages = 0, delay = None):
+        """Schedules a periodic announcement.
+
+        Args:
+            chat (MixerChat): Chat to send the announcement to.
+            message (str): Text to send, or a (coroutine) function returning it.
+            interval (float): Seconds between announcements.
+            min_messages (int): Skip the announcement unless this many chat messages were received since the last one.
+            delay (float): Seconds until the first announcement, defaults to 'interval'.
+
+        Returns:
+            :class:`MixerAnnouncement`: The scheduled announcement, which can be cancelled.
+        """
+        due = time.monotonic() + (interval if delay is None else delay)
+        announcement = MixerAnnouncement(chat, message, interval, min_messages, due)
+        self._push(announcement)
+
+        # the task is created on first use, inside the running event loop
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        self._changed.set()
+        return announcement
+
+    def _push(self, announcement):
+        heapq.heappush(self._heap, (announcement.due, next(self._sequence), announcement))
+
+    def __len__(self):
+        return sum(1 for _, _, announcement in self._heap if not announcement.cancelled)
+
+    async def _run(self):
+        while True:
+            self._changed.clear()
+            now = time.monotonic()
+
+            while self._heap and self._heap[0][0] <= now:
+                _, _, announcement = heapq.heappop(self._heap)
+                if announcement.cancelled:
+                    continue
+                self._fire(announcement)
+                announcement.due = max(announcement.due + announcement.interval, now)
+                self._push(announcement)
+
+            # sleep until the next announcement is due, or one is added
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, announcement):
+
+        # don't pile up copies behind a chat's rate limit
+        if announcement.sending or not announcement.active():
+            announcement.skipped += 1
+            return
+        announcement.last_count = announcement.chat.message_count
+        announcement.sending = True
+
+        # sending may wait on the chat's rate limit, which shouldn't delay other chats
+        task = asyncio.ensure_future(self._send(announcement))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, announcement):
+        try:
+            text = await announcement.text()
+            if text:
+                await announcement.chat.send_message(text, wait = True)
+                announcement.sent += 1
+        except Exception:
+            logger.exception("Failed to send announcement to channel %s.", announcement.chat.channel.id)
+        finally:
+            announcement.sending = False
+
+    def close(self):
+        """Cancels the scheduler task, every announcement being sent and every scheduled announcement."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self.tasks):
+            task.cancel()
+        for _, _, announcement in self._heap:
+            announcement.cancel()
+        self._heap = list()
+
+        # bound to the loop it was created in, the next add may be on a new loop (ex: MixerRunner.run again)
+        self._changed = None
+
+# shared by every chat unless a scheduler is passed to MixerChat.announce
+scheduler = MixerScheduler()
@@ -0,0 +1,79 @@
+class MixerSession:
+    """An aiohttp session with an explicitly configured connection pool.
+
+    One session can be shared by several :class:`mixer.api.MixerAPI` instances (ex: one per
+    client id). The underlying aiohttp session is created on first use, inside the running
+    event loop, and closed once every MixerAPI using it has been closed.
+    """
+
+    def __init__(self, limit = 100, limit_per_host = 0, ttl_dns_cache = 300, keepalive_timeout = 15, timeout = 30, connect_timeout = None):
+        """
+        Args:
+            limit (int): Maximum amount of simultaneous connections (0 for no limit).
+            limit_per_host (int): Maximum amount of simultaneous connections to one host (0 for no limit).
+            ttl_dns_cache (int): Seconds to cache DNS lookups for (None caches forever).
+            keepalive_timeout (float): Seconds to keep idle connections open for reuse.
+            timeout (float): Total timeout of a request, in seconds.
+            connect_timeout (float): Timeout for acquiring a connection and connecting, in seconds.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+        self._session = None
+        self._users = 0
+        self.requests = 0 # total amount of requests sent
+        self.in_flight = 0 # requests currently waiting for a response
+
+    @property
+    def session(self):
+        """aiohttp.ClientSession: The underlying session, created on first use."""
+        if self._session is None or self._session.closed:
+            import aiohttp # imported on first use, it's slow to import
+            connector = aiohttp.TCPConnector(
+                limit = self.limit,
+                limit_per_host = self.limit_per_host,
+                ttl_dns_cache = self.ttl_dns_cache,
+                keepalive_timeout = self.keepalive_timeout
+            )
+            timeout = aiohttp.ClientTimeout(total = self.timeout, connect = self.connect_timeout)
+            self._session = aiohttp.ClientSession(connector = connector, timeout = timeout)
+        return self._session
+
+    def acquire(self):
+        """Registers a user of this session (see release)."""
+        self._users += 1
+
+    async def release(self):
+        """Unregisters a user of this session, closing it once it's unused."""
+        self._users = max(self._users - 1, 0)
+        if self._users == 0:
+            await self.close()
+
+    async def close(self):
+        """Closes the underlying session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self):
+        """dict: Connection pool utilization."""
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+
+        # aiohttp doesn't expose these publicly, so fall back gracefully if its internals change
+        acquired = len(getattr(connector, "_acquired", ())) if connector is not None else 0
+        idle = sum(len(c) for c in getattr(connector, "_conns", dict()).values()) if connector is not None else 0
+
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "connections_in_use": acquired,
+            "connections_idle": idle,
+            "utilization": acquired / self.limit if self.limit else None,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "users": self._users
+        }
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError: # windows
+    fcntl = None
+    import msvcrt
+
+class MixerTokenStore:
+    """Shared storage for OAuth tokens, used by :class:`mixer.oauth.MixerOAuth` to avoid redundant refreshes.
+
+    Subclasses implement load/save, and acquire/release if the store is shared between processes.
+    """
+
+    def load(self):
+        """dict: The stored token data, or None if nothing was stored yet."""
+        raise NotImplementedError
+
+    def save(self, data):
+        """Stores token data (access_token, refresh_token, expires, user_id, username)."""
+        raise NotImplementedError
+
+    def acquire(self):
+        """Blocks until this process holds the store's lock."""
+        pass
+
+    def release(self):
+        """Releases the store's lock."""
+        pass
+
+class MixerMemoryTokenStore(MixerTokenStore):
+    """Keeps tokens in memory, sharing them between MixerOAuth instances in one process."""
+
+    def __init__(self, data = None):
+        self.data = data
+        self._lock = threading.Lock() # acquired from the executor, not the event loop
+
+    def load(self):
+        return self.data
+
+    def save(self, data):
+        self.data = dict(data)
+
+    def acquire(self):
+        self._lock.acquire()
+
+    def release(self):
+        self._lock.release()
+
+class MixerFileTokenStore(MixerTokenStore):
+    """Keeps tokens in a json file, guarded by a lock file so several processes can share it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._lock_file = None
+
+    def load(self):
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, data):
+        # write to a temporary file first, so readers never see a partially written file
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.path)
+
+    def acquire(self):
+        lock_file = open(self.lock_path, "a+")
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        self._lock_file = lock_file
+
+    def release(self):
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        lock_file.close()
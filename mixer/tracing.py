@@ -0,0 +1,145 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class MixerCommandTrace:
+    """Timing spans for a single chat command, from parsing to the response being sent."""
+
+    __slots__ = ("command", "username", "started", "last", "spans", "profiler", "outcome")
+
+    def __init__(self, username):
+        self.command = None
+        self.outcome = None # ex: 'ok', 'error', 'unknown_command', 'cooldown' (set when the trace is finished)
+        self.username = username
+        self.started = self.last = time.perf_counter()
+        self.spans = list()
+        self.profiler = None
+
+    def mark(self, phase):
+        """Ends the current span, attributing the time since the previous mark to a phase.
+
+        Args:
+            phase (str): Name of the phase which just completed (ex: 'parse').
+        """
+        now = time.perf_counter()
+        self.spans.append((phase, now - self.last))
+        self.last = now
+
+    @property
+    def duration(self):
+        """float: Seconds between the start of the trace and the last mark."""
+        return self.last - self.started
+
+    def to_dict(self):
+        """dict: The trace as plain data, suitable for logging/serialization."""
+        return {
+            "command": self.command,
+            "username": self.username,
+            "outcome": self.outcome,
+            "duration": self.duration,
+            "spans": dict(self.spans)
+        }
+
+class MixerCommandTracer:
+    """Traces the phases of chat commands and keeps a log of slow ones.
+
+    Phases are 'parse', 'permissions', 'resolve' (parameter conversion, including
+    MIXER_USER lookups), 'queued' (waiting for the command task to start),
+    'handler' and 'send' (sending the response to chat).
+    """
+
+    def __init__(self, slow_threshold = 1.0, phase_thresholds = None, slow_log_size = 100, on_slow = None):
+        """
+        Args:
+            slow_threshold (float): Commands taking longer than this (in seconds) are logged as slow.
+            phase_thresholds (dict): Per-phase thresholds, ex: { "resolve": 0.25 }.
+            slow_log_size (int): Amount of slow command traces to keep.
+            on_slow (function): Optional callable invoked with each slow :class:`MixerCommandTrace`.
+        """
+        self.slow_threshold = slow_threshold
+        self.phase_thresholds = phase_thresholds or dict()
+        self.slow_log = deque(maxlen = slow_log_size)
+        self.on_slow = on_slow
+
+        # command name -> remaining amount of invocations to profile
+        self._profile_requests = dict()
+        self.profiles = deque(maxlen = slow_log_size)
+
+    def begin(self, message):
+        """:class:`MixerCommandTrace`: Starts tracing a command sent in a chat message."""
+        return MixerCommandTrace(message.username)
+
+    def is_slow(self, trace):
+        """bool: Determines if a trace exceeds the total or any per-phase threshold."""
+        if self.slow_threshold is not None and trace.duration >= self.slow_threshold:
+            return True
+        for phase, duration in trace.spans:
+            threshold = self.phase_thresholds.get(phase)
+            if threshold is not None and duration >= threshold:
+                return True
+        return False
+
+    def finish(self, trace):
+        """Completes a trace, logging it if it was slow."""
+
+        if trace.profiler is not None:
+            self._store_profile(trace)
+
+        if not self.is_slow(trace):
+            return
+
+        self.slow_log.append(trace)
+        spans = ", ".join("{}={:.4f}s".format(phase, duration) for phase, duration in trace.spans)
+        logger.warning("slow command '%s' from %s took %.4fs (%s, outcome %s)", trace.command, trace.username, trace.duration, spans, trace.outcome)
+        if self.on_slow is not None:
+            self.on_slow(trace)
+
+    def profile(self, name, count = 1):
+        """Profiles the next invocations of a command's handler with cProfile.
+
+        Results are stored in 'profiles' as (command name, stats text) tuples.
+        Note that other tasks running while the handler awaits are profiled too.
+
+        Args:
+            name (str): Name of the command to profile.
+            count (int): Amount of invocations to profile.
+        """
+        self._profile_requests[name.lower()] = count
+
+    def start_profiler(self, trace):
+        """Enables a profiler for this trace if its command was chosen for profiling."""
+
+        remaining = self._profile_requests.get(trace.command)
+        if not remaining:
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already active
+            return
+
+        trace.profiler = profiler
+        if remaining > 1:
+            self._profile_requests[trace.command] = remaining - 1
+        else:
+            del self._profile_requests[trace.command]
+
+    def stop_profiler(self, trace):
+        """Disables the profiler for this trace, if there is one."""
+        if trace.profiler is not None:
+            trace.profiler.disable()
+
+    def _store_profile(self, trace, limit = 25):
+        stream = io.StringIO()
+        stats = pstats.Stats(trace.profiler, stream = stream)
+        stats.sort_stats("cumulative").print_stats(limit)
+        trace.profiler = None
+        self.profiles.append((trace.command, stream.getvalue()))
+        logger.info("captured profile for command '%s' (%.4fs)", trace.command, trace.duration)
@@ -1,16 +1,25 @@
 import asyncio
 import inspect
 
+# shared by every call, so objects created in one call (ex: a MixerChat) can be used in the next
+_loop = None
+
 def run(*args):
+    """Runs coroutines until they finish, on an event loop which is reused by every call.
+
+    Nothing is shut down between calls (ex: run(init()) then run(chat.start(oauth))).
+    See :class:`mixer.runner.MixerRunner` for signal handling and graceful shutdown.
+    """
+    global _loop
 
     coros = list(filter(inspect.iscoroutine, args))
-    future = None
+    if not coros:
+        return None
 
-    if len(coros) == 1:
-        future = coros[0]
-    elif len(coros) > 1:
-        future = asyncio.gather(*coros)
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
 
-    if future:
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(future)
+    async def main():
+        return await (coros[0] if len(coros) == 1 else asyncio.gather(*coros))
+    return _loop.run_until_complete(main())
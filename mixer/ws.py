@@ -1,13 +1,38 @@
 import json
-import websockets
+import asyncio
 import inspect
 
+from .capture import INBOUND, OUTBOUND
+from .metrics import metrics
+
 class MixerWS():
 
-    def __init__(self, url, **kwargs):
+    def __init__(self, url, compression = "deflate", max_size = 2 ** 20, max_queue = 16, **kwargs):
+        """
+        Args:
+            url (str): Websocket endpoint.
+            compression (str): "deflate" to negotiate permessage-deflate, None to disable compression.
+            max_size (int): Maximum size of an incoming message, in bytes (None for no limit).
+            max_queue (int): Maximum amount of incoming messages buffered before reading pauses (None for no limit).
+            **kwargs: Passed to websockets.connect.
+        """
         self.url = url
         self.on_connected = kwargs.pop("on_connected", None)
+        self.recorder = kwargs.pop("recorder", None) # optional MixerPacketRecorder
+        self.compression = compression
+        self.max_size = max_size
+        self.max_queue = max_queue
         self.kwargs = kwargs
+        self.websocket = None
+
+        # set by close(), so readers can tell a deliberate close from a lost connection
+        self.closing = False
+
+        # payload bytes (uncompressed json) and wire bytes (frames as sent/received, after compression)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.wire_bytes_sent = 0
+        self.wire_bytes_received = 0
 
     async def try_call(self, func, *opts):
         """Calls a coroutine function with parameters, if it's defined."""
@@ -16,9 +41,95 @@ class MixerWS():
 
     async def connect(self):
         """Establishes connection to websocket endpoint and calls on_connected callback."""
-        self.websocket = await websockets.connect(self.url, **self.kwargs)
+        import websockets # imported on first use, it's slow to import
+        self.closing = False
+        self.websocket = await websockets.connect(self.url, compression = self.compression, max_size = self.max_size, max_queue = self.max_queue, **self.kwargs)
+        self._count_wire_bytes()
         await self.try_call(self.on_connected)
 
+    def _count_wire_bytes(self):
+        """Wraps the connection's transport, to count bytes after compression and framing (the handshake isn't counted).
+
+        Counts are only exact on asyncio's default event loop. If the transport can't be wrapped
+        (ex: uvloop's transports don't allow it), wire byte counts are None.
+        """
+        websocket = self.websocket
+        transport = getattr(websocket, "transport", None)
+        data_received = getattr(websocket, "data_received", None)
+        if transport is None or data_received is None:
+            self.wire_bytes_sent = self.wire_bytes_received = None # unsupported websockets version
+            return
+
+        # other loops (ex: uvloop) may hold on to data_received instead of looking it up per call,
+        # so the wrapper would never see received bytes
+        if not isinstance(asyncio.get_event_loop(), asyncio.BaseEventLoop):
+            self.wire_bytes_sent = self.wire_bytes_received = None
+            return
+
+        write = transport.write
+        def counting_write(data):
+            self.wire_bytes_sent += len(data)
+            if metrics.enabled:
+                metrics.ws_bytes.inc(len(data), direction = "sent", encoding = "wire")
+            write(data)
+
+        def counting_data_received(data):
+            self.wire_bytes_received += len(data)
+            if metrics.enabled:
+                metrics.ws_bytes.inc(len(data), direction = "received", encoding = "wire")
+            data_received(data)
+
+        try:
+            transport.write = counting_write
+        except AttributeError: # transports without an instance __dict__
+            self.wire_bytes_sent = self.wire_bytes_received = None
+            return
+        try:
+            websocket.data_received = counting_data_received
+        except AttributeError:
+            del transport.write
+            self.wire_bytes_sent = self.wire_bytes_received = None
+
+    @property
+    def compressed(self):
+        """bool: Indicates if permessage-deflate was negotiated with the server."""
+        protocol = getattr(self.websocket, "protocol", self.websocket)
+        extensions = getattr(protocol, "extensions", None) or []
+        return any(extension.name == "permessage-deflate" for extension in extensions)
+
+    def stats(self):
+        """dict: Payload vs wire byte counts, and the resulting compression ratios (wire / payload)."""
+        ratio = lambda wire, payload: wire / payload if wire is not None and payload else None
+        return {
+            "compressed": self.compressed,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "wire_bytes_sent": self.wire_bytes_sent,
+            "wire_bytes_received": self.wire_bytes_received,
+            "sent_ratio": ratio(self.wire_bytes_sent, self.bytes_sent),
+            "received_ratio": ratio(self.wire_bytes_received, self.bytes_received)
+        }
+
+    async def close(self):
+        """Closes the connection to the websocket endpoint."""
+        if self.websocket is None:
+            return
+        self.closing = True
+
+        # unread packets can pause reading, which would stall the closing handshake until it times out
+        discard = asyncio.ensure_future(self._discard_packets())
+        try:
+            await self.websocket.close()
+        finally:
+            discard.cancel()
+
+    async def _discard_packets(self):
+        try:
+            while True:
+                await self.websocket.recv()
+        except Exception: # closed, or something else is reading already
+            pass
+
     async def send_packet(self, packet):
         """Sends a packet to the server.
 
@@ -26,9 +137,21 @@ class MixerWS():
             packet (dict): Data to be json encoded and send.
         """
         packet_raw = json.dumps(packet)
+        if self.recorder is not None:
+            self.recorder.record(OUTBOUND, packet_raw)
+        size = len(packet_raw.encode())
+        self.bytes_sent += size
+        if metrics.enabled:
+            metrics.ws_bytes.inc(size, direction = "sent", encoding = "payload")
         await self.websocket.send(packet_raw)
 
     async def receive_packet(self):
         """dict: Receives a packet from the server."""
         packet_raw = await self.websocket.recv()
+        if self.recorder is not None:
+            self.recorder.record(INBOUND, packet_raw)
+        size = len(packet_raw.encode()) if isinstance(packet_raw, str) else len(packet_raw)
+        self.bytes_received += size
+        if metrics.enabled:
+            metrics.ws_bytes.inc(size, direction = "received", encoding = "payload")
         return json.loads(packet_raw)
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from mixer.chatlog import MixerChatLog, INDEX_RECORD
+
+def message(i, user_id):
+    return { "id": "message-{}".format(i), "user_id": user_id, "message": { "message": [{ "type": "text", "text": str(i) }] } }
+
+class ChatLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith(".jsonl"))
+
+    def write(self, count, **kwargs):
+        async def write():
+            log = MixerChatLog(self.path, **kwargs)
+            for i in range(count):
+                log.append(message(i, i % 3))
+                await log.flush()
+            await log.close()
+        asyncio.run(write())
+
+    def test_round_trip(self):
+        self.write(30, segment_size = 1024)
+        segments = self.segments()
+        self.assertGreater(len(segments), 1)
+
+        # every sealed segment has indexes with one record per line
+        for name in segments:
+            segment = os.path.join(self.path, name)
+            with open(segment, "rb") as file:
+                lines = len(file.readlines())
+            for suffix in (".idx", ".uidx"):
+                self.assertEqual(os.path.getsize(segment + suffix), lines * INDEX_RECORD.size)
+
+        async def read():
+            log = MixerChatLog(self.path)
+            try:
+                self.assertEqual((await log.find("message-17"))["message"], message(17, 2))
+                self.assertIsNone(await log.find("missing"))
+                history = await log.history(1)
+                self.assertEqual([entry["message"]["id"] for entry in history], ["message-{}".format(i) for i in range(28, 0, -3)])
+                self.assertEqual(len(await log.history(1, limit = 2)), 2)
+            finally:
+                await log.close()
+        asyncio.run(read())
+
+    def test_rotation(self):
+        # a batch which fills the segment seals it, so the next batch starts a new one
+        self.write(2, segment_size = 50)
+        segments = self.segments()
+        self.assertEqual(len(segments), 2)
+        for name in segments:
+            with open(os.path.join(self.path, name), "rb") as file:
+                self.assertEqual(len(file.readlines()), 1)
+
+    def test_retention(self):
+        self.write(30, segment_size = 256, max_segments = 2)
+        self.assertLessEqual(len(self.segments()), 3) # sealed segments, plus the last one sealed on close
+
+    def test_recovery(self):
+        self.write(10)
+
+        # a crash leaves the active segment without indexes, and possibly a partially written line
+        segment = os.path.join(self.path, self.segments()[-1])
+        for suffix in (".idx", ".uidx"):
+            os.remove(segment + suffix)
+        with open(segment, "ab") as file:
+            file.write(b'{"time":0,"message":{"id":"cut')
+
+        async def read():
+            log = MixerChatLog(self.path)
+            try:
+                self.assertTrue(os.path.exists(segment + ".idx"))
+                self.assertEqual((await log.find("message-9"))["message"], message(9, 0))
+                self.assertEqual(len(await log.history(0)), 4)
+            finally:
+                await log.close()
+        asyncio.run(read())
+
+    def test_recovery_missing_user_index(self):
+        self.write(10)
+
+        # a crash between writing the two indexes leaves only the id index
+        segment = os.path.join(self.path, self.segments()[-1])
+        os.remove(segment + ".uidx")
+
+        async def read():
+            log = MixerChatLog(self.path)
+            try:
+                self.assertTrue(os.path.exists(segment + ".uidx"))
+                self.assertEqual(len(await log.history(0)), 4)
+            finally:
+                await log.close()
+        asyncio.run(read())
+
+if __name__ == "__main__":
+    unittest.main()